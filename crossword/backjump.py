@@ -0,0 +1,167 @@
+from mac import MACCrosswordCreator
+
+
+class BackjumpCrosswordCreator(MACCrosswordCreator):
+    """
+    Crossword generator using forward checking with conflict-directed
+    backjumping (FC-CBJ) and nogood learning.
+
+    Every domain reduction made by forward checking is blamed on the
+    variable whose assignment caused it. When a variable runs out of
+    values, the search jumps back to the most recent variable in its
+    conflict set instead of the chronologically previous one, and the
+    words assigned to the conflict set are remembered as a nogood.
+    """
+
+    # Largest number of variables in a learned nogood
+    NOGOOD_SIZE = 4
+
+    def __init__(self, crossword, **options):
+        """
+        Create new CSP crossword generate.
+        """
+        super().__init__(crossword, **options)
+
+        # Variables whose assignment pruned each variable's domain,
+        # and the pruned variables in order, to undo them
+        self.pruners = {var: [] for var in self.crossword.variables}
+        self.pruned = []
+
+        # Variables blamed for the failures of each variable's values
+        self.conflicts = {var: set() for var in self.crossword.variables}
+
+        # Position of each assigned variable in the assignment order
+        self.depth = dict()
+
+        # Learned nogoods, indexed by each of their (variable, word) pairs
+        self.nogoods = dict()
+        self.learned = 0
+
+    def mark(self):
+        """
+        Return a mark of the current search state, to `undo` back to.
+        """
+        return (len(self.trail), len(self.pruned))
+
+    def undo(self, mark):
+        """
+        Restore every domain and pruner recorded since `mark`, a pair of
+        trail and pruned lengths.
+        """
+        trail, pruned = mark
+        super().undo(trail)
+        while len(self.pruned) > pruned:
+            self.pruners[self.pruned.pop()].pop()
+
+    def forward_check(self, var, word, assignment):
+        """
+        Remove the words incompatible with `var` = `word` from the domains
+        of unassigned variables, blaming `var` for the removals.
+        Return a variable whose domain was wiped out, or None.
+        """
+        bit = self.index.bit(word)
+        reductions = []
+
+        # Neighbors must agree on the shared cell
+        for neighbor, i, j in self.crossword.adjacency[var]:
+            if neighbor not in assignment:
+                words = self.index.letters(neighbor.length, j).get(word[i], 0)
+                reductions.append((neighbor, words))
+
+        # Each word can be used only once
+        for other in self.by_length[var.length]:
+            if other is not var and other not in assignment:
+                reductions.append((other, ~bit))
+
+        for other, words in reductions:
+            self.revisions += 1
+            domain = self.domains[other] & words
+            if domain != self.domains[other]:
+                self.narrow(other, domain)
+                self.pruners[other].append(var)
+                self.pruned.append(other)
+                if not domain:
+                    return other
+        return None
+
+    def violated_nogood(self, var, word, assignment):
+        """
+        Return the other variables of a learned nogood that `var` = `word`
+        would complete, or None if no nogood is violated.
+        """
+        for nogood in self.nogoods.get((var, word), ()):
+            if all(
+                assignment.get(other) == other_word
+                for other, other_word in nogood if other != var
+            ):
+                return {other for other, _ in nogood if other != var}
+        return None
+
+    def learn(self, conflict, assignment):
+        """
+        Remember that the words assigned to the variables in `conflict`
+        cannot all be part of a solution.
+        """
+        if len(conflict) > self.NOGOOD_SIZE:
+            return
+        nogood = frozenset((var, assignment[var]) for var in conflict)
+        for pair in nogood:
+            self.nogoods.setdefault(pair, set()).add(nogood)
+        self.learned += 1
+
+    def backtrack(self, assignment):
+        """
+        Using Backtracking Search with conflict-directed backjumping,
+        return a complete assignment extending `assignment`.
+
+        If the search fails, return the variable to jump back to, or
+        None if no assignment is possible at all or the search ran out
+        of budget.
+        """
+        if len(assignment) == len(self.crossword.variables):
+            return assignment
+
+        var = self.select_unassigned_variable(assignment)
+        self.conflicts[var] = set()
+
+        for word in self.order_domain_values(var, assignment):
+            if self.out_of_budget():
+                return None
+            self.nodes += 1
+
+            culprits = self.violated_nogood(var, word, assignment)
+            if culprits is not None:
+                self.conflicts[var] |= culprits
+                continue
+
+            mark = self.mark()
+            assignment[var] = word
+            self.depth[var] = len(assignment)
+            self.narrow(var, self.index.bit(word))
+
+            wiped = self.forward_check(var, word, assignment)
+            if wiped is not None:
+                self.conflicts[var].update(self.pruners[wiped])
+                self.conflicts[var].discard(var)
+                result = var
+            else:
+                result = self.backtrack(assignment)
+                if isinstance(result, dict):
+                    return result
+
+            self.undo(mark)
+            del assignment[var]
+            del self.depth[var]
+
+            # Keep trying values only if the failure was blamed on `var`
+            if result is not var:
+                return result
+
+        # Every value failed: jump back to the latest culprit
+        conflict = self.conflicts[var] | set(self.pruners[var])
+        if not conflict:
+            return None
+        self.learn(conflict, assignment)
+        culprit = max(conflict, key=self.depth.get)
+        self.conflicts[culprit] |= conflict - {culprit}
+        return culprit
@@ -0,0 +1,210 @@
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from crossword import Crossword
+from index import WordIndex
+from solvers import SOLVERS
+from structures import generate_structure, write_structure
+
+# Columns of the benchmark table
+FIELDS = [
+    "solver", "size", "density", "words", "variables", "status",
+    "setup", "overlaps", "solve", "nodes", "revisions", "memory", "check",
+]
+
+
+def check(crossword, assignment):
+    """
+    Return a description of what is wrong with `assignment` as a solution
+    of `crossword`, or None if it is a solution.
+    """
+    if set(assignment) != crossword.variables:
+        return "not every variable is assigned"
+    if len(set(assignment.values())) != len(assignment):
+        return "a word is used twice"
+    for var, word in assignment.items():
+        if len(word) != var.length or word not in crossword.words:
+            return f"{word} does not fit {var}"
+        for other, i, j in crossword.adjacency[var]:
+            if word[i] != assignment[other][j]:
+                return f"{word} conflicts with {assignment[other]}"
+    return None
+
+
+def run(solver, structure_file, words_file, results):
+    """
+    Solve one crossword with `solver`, and report measurements on the
+    `results` queue: first the timings and counters of an untraced run,
+    then the peak memory of a second run, traced with tracemalloc.
+    """
+    start = time.perf_counter()
+    crossword = Crossword(structure_file, words_file)
+    crossword.index
+    setup = time.perf_counter() - start
+
+    # Overlaps are computed in the constructor; time them on their own
+    start = time.perf_counter()
+    crossword.compute_overlaps()
+    overlaps = time.perf_counter() - start
+
+    start = time.perf_counter()
+    creator = SOLVERS[solver](crossword)
+    assignment = creator.solve()
+    elapsed = time.perf_counter() - start
+
+    status = "no solution"
+    if assignment is not None:
+        problem = check(crossword, assignment)
+        status = "solved" if problem is None else f"invalid: {problem}"
+    results.put({
+        "variables": len(crossword.variables),
+        "status": status,
+        "setup": setup,
+        "overlaps": overlaps,
+        "solve": elapsed,
+        "nodes": creator.nodes,
+        "revisions": creator.revisions,
+    })
+
+    tracemalloc.start()
+    SOLVERS[solver](crossword).solve()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results.put({"memory": peak})
+
+
+def measure(solver, structure_file, words_file, timeout):
+    """
+    Run `solver` in its own process, stopping it after `timeout` seconds
+    for each of its two runs, and return its measurements.
+    """
+    results = multiprocessing.Queue()
+    worker = multiprocessing.Process(
+        target=run,
+        args=(solver, structure_file, words_file, results),
+        daemon=True
+    )
+    worker.start()
+
+    entry = {"status": "timed out"}
+    try:
+        entry.update(results.get(timeout=timeout))
+        entry.update(results.get(timeout=timeout))
+    except queue.Empty:
+        pass
+    finally:
+        if worker.is_alive():
+            worker.terminate()
+        worker.join()
+    return entry
+
+
+def main():
+
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(usage=(
+        "python benchmark.py [--solvers NAME ...] [--sizes N ...] "
+        "[--densities D ...] [--words FILE ...] [--seed SEED] "
+        "[--timeout SECONDS] [--csv FILE]"
+    ))
+    parser.add_argument("--solvers", nargs="+", choices=list(SOLVERS),
+                        default=list(SOLVERS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[5, 7, 9])
+    parser.add_argument("--densities", nargs="+", type=float,
+                        default=[0.2, 0.3])
+    parser.add_argument("--words", nargs="+",
+                        default=["data/words1.txt", "data/words2.txt"])
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the generated structures")
+    parser.add_argument("--timeout", type=float, default=60,
+                        help="time limit of each run in seconds")
+    parser.add_argument("--csv", help="file to write the results to")
+    args = parser.parse_args()
+
+    # Compile each dictionary once, so no run pays for it
+    for words_file in args.words:
+        WordIndex.load(words_file)
+
+    print(" ".join(f"{field:>11}" for field in FIELDS))
+    rows = []
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size, density, words_file in itertools.product(
+            args.sizes, args.densities, args.words
+        ):
+            structure_file = os.path.join(directory, f"{size}-{density}.txt")
+            write_structure(structure_file, generate_structure(
+                size, size, density, seed=args.seed
+            ))
+            entries = []
+            for solver in args.solvers:
+                entry = measure(solver, structure_file, words_file,
+                                args.timeout)
+                entry.update({
+                    "solver": solver,
+                    "size": size,
+                    "density": density,
+                    "words": os.path.basename(words_file),
+                })
+                entries.append(entry)
+
+            # Every solver that finished must return a valid solution,
+            # and all of them must agree on whether there is one
+            outcomes = {
+                entry["status"] for entry in entries
+                if entry["status"] in ("solved", "no solution")
+            }
+            for entry in entries:
+                if entry["status"].startswith("invalid"):
+                    entry["check"] = "invalid"
+                elif entry["status"] == "timed out":
+                    entry["check"] = "-"
+                elif len(outcomes) > 1:
+                    entry["check"] = "disagree"
+                else:
+                    entry["check"] = "ok"
+                if entry["check"] in ("invalid", "disagree"):
+                    failures.append(
+                        f"{entry['solver']} on {size}x{size}, density "
+                        f"{density}, {entry['words']}: {entry['status']}"
+                    )
+                rows.append(entry)
+                print(" ".join(
+                    f"{format_value(entry.get(field)):>11}"
+                    for field in FIELDS
+                ), flush=True)
+
+    # Write results
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for entry in rows:
+                writer.writerow({field: entry.get(field) for field in FIELDS})
+
+    if failures:
+        sys.exit("Solvers disagree or returned invalid solutions:\n"
+                 + "\n".join(failures))
+
+
+def format_value(value):
+    """
+    Format a measurement for the printed table.
+    """
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    return str(value)
+
+
+if __name__ == "__main__":
+    main()
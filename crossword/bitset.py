@@ -0,0 +1,124 @@
+from generate import CrosswordCreator
+
+
+class BitsetCrosswordCreator(CrosswordCreator):
+    """
+    Crossword generator whose domains are bitsets over a `WordIndex`.
+
+    `self.domains` maps each variable to an int, where bit k is set if
+    the kth word of the variable's length is still possible.
+    """
+
+    def __init__(self, crossword):
+        """
+        Create new CSP crossword generate.
+        """
+        self.crossword = crossword
+        self.index = crossword.index
+
+        # Domains start as the whole bucket of words of the right length
+        self.domains = {
+            var: self.index.full(var.length)
+            for var in self.crossword.variables
+        }
+
+        # Number of values tried during search, and of arc revisions
+        self.nodes = 0
+        self.revisions = 0
+
+    def domain_size(self, var):
+        """
+        Return the number of words left in the domain of `var`.
+        """
+        return self.domains[var].bit_count()
+
+    def domain_words(self, var):
+        """
+        Return the list of words left in the domain of `var`.
+        """
+        return self.index.decode(var.length, self.domains[var])
+
+    def narrow(self, var, domain):
+        """
+        Replace the domain of `var` by `domain`, a subset of it.
+        """
+        self.domains[var] = domain
+
+    def enforce_node_consistency(self):
+        """
+        Domains only ever contain words of the variable's length,
+        so every variable is already node-consistent.
+        """
+        return
+
+    def supported(self, x, y):
+        """
+        Return the bitset of words of `x` that agree with at least one
+        word left in the domain of `y` on the cell they share.
+        """
+        i, j = self.crossword.overlaps[x, y]
+        x_letters = self.index.letters(x.length, i)
+        y_domain = self.domains[y]
+
+        support = 0
+        for letter, words in self.index.letters(y.length, j).items():
+            if words & y_domain:
+                support |= x_letters.get(letter, 0)
+        return support
+
+    def revise(self, x, y):
+        """
+        Make variable `x` arc consistent with variable `y`.
+        To do so, remove values from `self.domains[x]` for which there is no
+        possible corresponding value for `y` in `self.domains[y]`.
+
+        Return True if a revision was made to the domain of `x`; return
+        False if no revision was made.
+        """
+        self.revisions += 1
+        if self.crossword.overlaps[x, y] is None:
+            return False
+
+        revised = self.domains[x] & self.supported(x, y)
+        if revised == self.domains[x]:
+            return False
+        self.narrow(x, revised)
+        return True
+
+    def order_domain_values(self, var, assignment):
+        """
+        Return a list of values in the domain of `var`, in order by
+        the number of values they rule out for neighboring variables.
+        """
+        # Number of words each letter would rule out for each neighbor
+        ruled_out = []
+        for neighbor, i, j in self.crossword.adjacency[var]:
+            if neighbor not in assignment:
+                domain = self.domains[neighbor]
+                size = domain.bit_count()
+                counts = {
+                    letter: size - (words & domain).bit_count()
+                    for letter, words
+                    in self.index.letters(neighbor.length, j).items()
+                }
+                ruled_out.append((i, counts, size))
+
+        def eliminated(word):
+            return sum(
+                counts.get(word[i], size) for i, counts, size in ruled_out
+            )
+
+        return sorted(self.domain_words(var), key=eliminated)
+
+    def select_unassigned_variable(self, assignment):
+        """
+        Return an unassigned variable not already part of `assignment`,
+        with the fewest remaining values and, among those, the highest
+        degree.
+        """
+        unassigned = self.crossword.variables - assignment.keys()
+        return min(
+            unassigned,
+            key=lambda var: (self.domain_size(var),
+                             -len(self.crossword.adjacency[var]))
+        )
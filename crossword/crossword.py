@@ -1,3 +1,6 @@
+from index import WordIndex
+
+
 class Variable():
 
     ACROSS = "across"
@@ -57,9 +60,10 @@ class Crossword():
                         row.append(False)
                 self.structure.append(row)
 
-        # Save vocabulary list
-        with open(words_file) as f:
-            self.words = set(f.read().upper().splitlines())
+        # Save vocabulary list location, loaded on first use
+        self.words_file = words_file
+        self._words = None
+        self._index = None
 
         # Determine variable set
         self.variables = set()
@@ -104,7 +108,12 @@ class Crossword():
                             length=length
                         ))
 
-        # Compute overlaps for each word
+        self.compute_overlaps()
+
+    def compute_overlaps(self):
+        """
+        Compute overlaps for each word, and each variable's neighbors.
+        """
         # For any pair of variables v1, v2, their overlap is either:
         #    None, if the two variables do not overlap; or
         #    (i, j), where v1's ith character overlaps v2's jth character
@@ -125,9 +134,28 @@ class Crossword():
                         cells2.index(intersection)
                     )
 
+        # Precompute each variable's overlapping variables, as a list of
+        # (neighbor, i, j), where var's ith character overlaps neighbor's jth
+        self.adjacency = {var: [] for var in self.variables}
+        for (v1, v2), overlap in self.overlaps.items():
+            if overlap is not None:
+                self.adjacency[v1].append((v2, *overlap))
+
+    @property
+    def words(self):
+        """Set of all words in the vocabulary."""
+        if self._words is None:
+            with open(self.words_file) as f:
+                self._words = set(f.read().upper().splitlines())
+        return self._words
+
+    @property
+    def index(self):
+        """Compiled `WordIndex` of the vocabulary, cached on disk."""
+        if self._index is None:
+            self._index = WordIndex.load(self.words_file)
+        return self._index
+
     def neighbors(self, var):
         """Given a variable, return set of overlapping variables."""
-        return set(
-            v for v in self.variables
-            if v != var and self.overlaps[v, var]
-        )
+        return set(neighbor for neighbor, _, _ in self.adjacency[var])
@@ -1,4 +1,8 @@
-import sys
+import argparse
+import itertools
+import os
+import time
+from collections import deque
 
 from crossword import *
 
@@ -11,10 +15,14 @@ class CrosswordCreator():
         """
         self.crossword = crossword
         self.domains = {
-            var: self.crossword.words.copy()
+            var: set(self.crossword.index.words.get(var.length, ()))
             for var in self.crossword.variables
         }
 
+        # Number of values tried during search, and of arc revisions
+        self.nodes = 0
+        self.revisions = 0
+
     def letter_grid(self, assignment):
         """
         Return 2D array representing a given assignment.
@@ -48,42 +56,19 @@ class CrosswordCreator():
         """
         Save crossword assignment to an image file.
         """
-        from PIL import Image, ImageDraw, ImageFont
-        cell_size = 100
-        cell_border = 2
-        interior_size = cell_size - 2 * cell_border
-        letters = self.letter_grid(assignment)
+        from render import renderer
+        renderer.save(self.crossword, self.letter_grid(assignment), filename)
 
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.crossword.width * cell_size,
-             self.crossword.height * cell_size),
-            "black"
+    def save_many(self, assignments, filenames, workers=None):
+        """
+        Save crossword assignments to image files, in parallel threads.
+        """
+        from render import renderer
+        renderer.save_many(
+            self.crossword,
+            [self.letter_grid(assignment) for assignment in assignments],
+            filenames, workers
         )
-        font = ImageFont.truetype("assets/fonts/OpenSans-Regular.ttf", 80)
-        draw = ImageDraw.Draw(img)
-
-        for i in range(self.crossword.height):
-            for j in range(self.crossword.width):
-
-                rect = [
-                    (j * cell_size + cell_border,
-                     i * cell_size + cell_border),
-                    ((j + 1) * cell_size - cell_border,
-                     (i + 1) * cell_size - cell_border)
-                ]
-                if self.crossword.structure[i][j]:
-                    draw.rectangle(rect, fill="white")
-                    if letters[i][j]:
-                        w, h = draw.textsize(letters[i][j], font=font)
-                        draw.text(
-                            (rect[0][0] + ((interior_size - w) / 2),
-                             rect[0][1] + ((interior_size - h) / 2) - 10),
-                            letters[i][j], fill="black", font=font
-                        )
-
-        img.save(filename)
 
     def solve(self):
         """
@@ -120,6 +105,7 @@ class CrosswordCreator():
         Return True if a revision was made to the domain of `x`; return
         False if no revision was made.
         """
+        self.revisions += 1
         i, j = self.crossword.overlaps[x, y]
         to_remove = set()
 
@@ -153,15 +139,20 @@ class CrosswordCreator():
         Return True if arc consistency is enforced and no domains are empty;
         return False if one or more domains end up empty.
         """
+        adjacency = self.crossword.adjacency
+
         # Initialization of the queue based on the arcs provided
-        if arcs:
-            queue = arcs
-        else:
-            queue = [(x, y) for x in self.crossword.variables for y in self.crossword.variables
-            if x != y and self.crossword.overlaps[x, y]]
+        if arcs is None:
+            arcs = [(x, y) for x in adjacency for y, _, _ in adjacency[x]]
+
+        # Keep track of the arcs in the queue, so none is queued twice
+        queued = dict.fromkeys(arcs)
+        queue = deque(queued)
 
         while queue:
-            x, y = queue.pop(0)
+            arc = queue.popleft()
+            del queued[arc]
+            x, y = arc
 
             # Check if any change was made
             if self.revise(x, y):
@@ -170,8 +161,9 @@ class CrosswordCreator():
                     return False
 
                 # Else add neighbors (different from y) to the queue
-                for z in self.crossword.neighbors(x):
-                    if z != y:
+                for z, _, _ in adjacency[x]:
+                    if z != y and (z, x) not in queued:
+                        queued[z, x] = None
                         queue.append((z, x))
 
         return True
@@ -203,10 +195,9 @@ class CrosswordCreator():
 
         # Check if there are conflicts between neighbors
         for x in assignment:
-            for y in self.crossword.neighbors(x):
+            for y, i, j in self.crossword.adjacency[x]:
 
                 if y in assignment:
-                    i, j = self.crossword.overlaps[x, y]
                     if assignment[x][i] != assignment[y][j]:
                         return False
 
@@ -226,9 +217,8 @@ class CrosswordCreator():
             counter = 0
             
             # Check for every neighbor which is not already assigned
-            for neighbor in self.crossword.neighbors(var):
+            for neighbor, i, j in self.crossword.adjacency[var]:
                 if neighbor not in assignment:
-                    i, j = self.crossword.overlaps[var, neighbor]
 
                     # If two words doesn't match the counter is increased
                     for n_word in self.domains[neighbor]:
@@ -260,7 +250,7 @@ class CrosswordCreator():
                 unassigned.remove(var)
 
         # Sort the remaining variables by the number of neighbors, and return the best
-        num_degrees = [(len(self.crossword.neighbors(var)), var) for var in unassigned]
+        num_degrees = [(len(self.crossword.adjacency[var]), var) for var in unassigned]
         return max(num_degrees, key=lambda var: var[0])[1]
 
     def backtrack(self, assignment):
@@ -280,6 +270,7 @@ class CrosswordCreator():
         variable = self.select_unassigned_variable(assignment)
 
         for word in self.order_domain_values(variable, assignment):
+            self.nodes += 1
             assignment_copy = assignment.copy()
             assignment_copy[variable] = word
             
@@ -292,33 +283,88 @@ class CrosswordCreator():
                 if res:
                     return res
 
+                # Otherwise, take the word back before trying the next one
+                del assignment[variable]
+
         # If no assignment was found, return None
         return None
 
 
 def main():
-
-    # Check usage
-    if len(sys.argv) not in [3, 4]:
-        sys.exit("Usage: python generate.py structure words [output]")
+    from solvers import SOLVERS
 
     # Parse command-line arguments
-    structure = sys.argv[1]
-    words = sys.argv[2]
-    output = sys.argv[3] if len(sys.argv) == 4 else None
+    parser = argparse.ArgumentParser(usage=(
+        "python generate.py structure words [output] "
+        "[--solver SOLVER] [--stats] [--count N] [--differ K] "
+        "[--exclude WORD ...]"
+    ))
+    parser.add_argument("structure")
+    parser.add_argument("words")
+    parser.add_argument("output", nargs="?")
+    parser.add_argument("--solver", choices=SOLVERS,
+                        help="search algorithm, by default backtrack, or "
+                             "mac when generating several solutions")
+    parser.add_argument("--stats", action="store_true",
+                        help="report nodes expanded and solve time")
+    parser.add_argument("--count", type=int, default=1,
+                        help="number of distinct solutions to generate")
+    parser.add_argument("--differ", type=int, default=1,
+                        help="minimum number of different words between "
+                             "any two solutions")
+    parser.add_argument("--exclude", nargs="+", default=[],
+                        help="words that must not be used")
+    args = parser.parse_args()
+    if args.count < 1:
+        parser.error("--count must be at least 1")
+    if args.differ < 1:
+        parser.error("--differ must be at least 1")
+
+    # Only some solvers can generate several solutions, or exclude words
+    several = args.count != 1 or args.differ != 1 or args.exclude
+    if args.solver is None:
+        args.solver = "mac" if several else "backtrack"
+    elif several and not hasattr(SOLVERS[args.solver], "solutions"):
+        parser.error(
+            f"solver {args.solver} generates a single solution, so "
+            f"--count, --differ and --exclude need one of: " + ", ".join(
+                name for name, solver in SOLVERS.items()
+                if hasattr(solver, "solutions")
+            )
+        )
 
     # Generate crossword
-    crossword = Crossword(structure, words)
-    creator = CrosswordCreator(crossword)
-    assignment = creator.solve()
-
-    # Print result
-    if assignment is None:
-        print("No solution.")
+    crossword = Crossword(args.structure, args.words)
+    creator = SOLVERS[args.solver](crossword)
+    start = time.perf_counter()
+    if several:
+        found = list(itertools.islice(
+            creator.solutions(differ=args.differ, exclude=args.exclude),
+            args.count
+        ))
     else:
+        assignment = creator.solve()
+        found = [] if assignment is None else [assignment]
+    elapsed = time.perf_counter() - start
+
+    # Print results
+    for k, assignment in enumerate(found):
+        if k:
+            print()
         creator.print(assignment)
-        if output:
-            creator.save(assignment, output)
+    if not found:
+        print("No solution.")
+    if args.stats:
+        print(f"{args.solver}: {creator.nodes} nodes in {elapsed:.3f}s")
+
+    # Save results, numbering output files if there may be several
+    if args.output and args.count > 1:
+        root, ext = os.path.splitext(args.output)
+        creator.save_many(found, [
+            f"{root}{k}{ext}" for k in range(1, len(found) + 1)
+        ])
+    elif args.output and found:
+        creator.save(found[0], args.output)
 
 
 if __name__ == "__main__":
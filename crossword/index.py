@@ -0,0 +1,248 @@
+import bisect
+import json
+import mmap
+import os
+
+# First bytes of a compiled dictionary file
+MAGIC = b"CROSSWORD-INDEX-1\n"
+
+
+class WordIndex():
+    """
+    Vocabulary bucketed by word length, with a positional letter index.
+
+    Sets of words of the same length are represented as bitsets (Python
+    ints), where bit k stands for the kth word of that length, in sorted
+    order.
+
+    An index can be compiled to a file with `save`, and reopened with
+    `open`, which memory-maps the file and only decodes the words and
+    bitsets that are used.
+    """
+
+    def __init__(self, words=()):
+
+        # Map each length to its sorted sequence of words
+        self.words = dict()
+        for word in sorted(words):
+            if word:
+                self.words.setdefault(len(word), []).append(word)
+
+        # Map (length, position) to a dict of letter -> bitset of words
+        # having that letter at that position
+        self.positions = dict()
+        for length, bucket in self.words.items():
+            for position in range(length):
+                members = dict()
+                for k, word in enumerate(bucket):
+                    members.setdefault(word[position], []).append(k)
+                self.positions[length, position] = {
+                    letter: to_bits(ks, len(bucket))
+                    for letter, ks in members.items()
+                }
+
+        # Compiled file backing the index, if any
+        self.path = None
+        self.source = None
+        self.data = None
+        self.locations = dict()
+
+    def __reduce__(self):
+        # Memory-mapped indexes are reopened from their file
+        if self.path is not None:
+            return (WordIndex.open, (self.path,))
+        return (WordIndex, ([w for b in self.words.values() for w in b],))
+
+    def full(self, length):
+        """Returns the bitset of all words of length `length`."""
+        return (1 << len(self.words.get(length, ()))) - 1
+
+    def letters(self, length, position):
+        """Returns a dict of letter -> bitset of words with that letter."""
+        key = (length, position)
+        if key not in self.positions:
+            if key not in self.locations:
+                return {}
+            self.positions[key] = {
+                letter: int.from_bytes(
+                    self.data[offset:offset + size], "little"
+                )
+                for letter, (offset, size) in self.locations[key].items()
+            }
+        return self.positions[key]
+
+    def find(self, word):
+        """Returns the position of `word` in its bucket, or None."""
+        bucket = self.words.get(len(word), ())
+        k = bisect.bisect_left(bucket, word)
+        if k < len(bucket) and bucket[k] == word:
+            return k
+        return None
+
+    def bit(self, word):
+        """Returns the bitset containing only `word`."""
+        return 1 << self.find(word)
+
+    def decode(self, length, bits):
+        """Returns the list of words of length `length` in `bits`."""
+        bucket = self.words.get(length, ())
+        return [bucket[k] for k in indices(bits)]
+
+    def save(self, path, source=None):
+        """
+        Compiles the index to the file at `path`.
+        `source` identifies the word list the index was built from.
+        """
+        header = {"source": source, "buckets": dict()}
+        blobs = []
+        offset = 0
+
+        def add(blob):
+            nonlocal offset
+            blobs.append(blob)
+            offset += len(blob)
+            return [offset - len(blob), len(blob)]
+
+        for length, bucket in self.words.items():
+
+            # Words are stored with a fixed width, so any of them can be
+            # read without decoding the others
+            encoding = "ascii"
+            if not all(word.isascii() for word in bucket):
+                encoding = "utf-32-le"
+            width = len(bucket[0].encode(encoding)) if bucket else 0
+            words = add(b"".join(word.encode(encoding) for word in bucket))
+
+            positions = []
+            for position in range(length):
+                positions.append({
+                    letter: add(bits.to_bytes((len(bucket) + 7) // 8,
+                                              "little"))
+                    for letter, bits in self.letters(length, position).items()
+                })
+
+            header["buckets"][length] = {
+                "count": len(bucket),
+                "encoding": encoding,
+                "width": width,
+                "words": words,
+                "positions": positions,
+            }
+
+        # Write to a temporary file first, so readers never see half of it
+        header = json.dumps(header).encode()
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(temporary, path)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Opens the compiled index at `path`, memory-mapping the file.
+        Raises ValueError if the file is not a compiled index.
+        """
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a compiled dictionary")
+            start = len(MAGIC) + 8
+            header_size = int.from_bytes(data[len(MAGIC):start], "little")
+            header = json.loads(data[start:start + header_size])
+            base = start + header_size
+        except ValueError:
+            data.close()
+            raise
+
+        index = cls()
+        index.path = path
+        index.source = header["source"]
+        index.data = data
+        for length, bucket in header["buckets"].items():
+            length = int(length)
+            offset, _ = bucket["words"]
+            index.words[length] = Bucket(
+                data, base + offset, bucket["count"],
+                bucket["width"], bucket["encoding"]
+            )
+            for position, letters in enumerate(bucket["positions"]):
+                index.locations[length, position] = {
+                    letter: (base + offset, size)
+                    for letter, (offset, size) in letters.items()
+                }
+        return index
+
+    @classmethod
+    def load(cls, words_file, cache_file=None):
+        """
+        Returns the index of the word list in `words_file`.
+
+        The compiled index is cached in `cache_file`, by default next to
+        the word list, and rebuilt when the word list changes. If the
+        cache cannot be written, the index is kept in memory only.
+        """
+        if cache_file is None:
+            cache_file = f"{words_file}.idx"
+        stat = os.stat(words_file)
+        source = [os.path.abspath(words_file), stat.st_size, stat.st_mtime_ns]
+
+        try:
+            index = cls.open(cache_file)
+            if index.source == source:
+                return index
+            index.data.close()
+        except (OSError, ValueError):
+            pass
+
+        with open(words_file) as f:
+            index = cls(set(f.read().upper().splitlines()))
+        try:
+            index.save(cache_file, source)
+        except OSError:
+            return index
+        return cls.open(cache_file)
+
+
+class Bucket():
+    """
+    Read-only sequence of the words of one length in a compiled index,
+    decoded from the memory-mapped file on access.
+    """
+
+    def __init__(self, data, offset, count, width, encoding):
+        self.data = data
+        self.offset = offset
+        self.count = count
+        self.width = width
+        self.encoding = encoding
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, k):
+        if not 0 <= k < self.count:
+            raise IndexError("word index out of range")
+        start = self.offset + k * self.width
+        return self.data[start:start + self.width].decode(self.encoding)
+
+
+def to_bits(ks, size):
+    """Returns the bitset with bits `ks` set, out of `size` bits."""
+    data = bytearray((size + 7) // 8)
+    for k in ks:
+        data[k >> 3] |= 1 << (k & 7)
+    return int.from_bytes(data, "little")
+
+
+def indices(bits):
+    """Yields the positions of the set bits of `bits`, in increasing order."""
+    digits = bin(bits)[:1:-1]
+    k = digits.find("1")
+    while k >= 0:
+        yield k
+        k = digits.find("1", k + 1)
@@ -0,0 +1,340 @@
+import random
+
+from bitset import BitsetCrosswordCreator
+
+
+class MACCrosswordCreator(BitsetCrosswordCreator):
+    """
+    Crossword generator that maintains arc consistency during search.
+
+    After each assignment, the assigned word is removed from every other
+    domain and AC-3 runs from the arcs of the variables that changed.
+    Domain changes are recorded on a trail, so backtracking restores
+    them without copying any domains or assignments.
+
+    For value ordering, each variable keeps a table of how many words
+    left in its domain have each letter at each position. The tables are
+    updated as domains shrink and grow back.
+
+    With a `seed`, ties between variables and between values are broken
+    randomly. With `restart`, the search restarts after a Luby sequence
+    of node budgets, in units of `restart` nodes, with new tie-breaking.
+    `value_order` is either "lcv" (least constraining value first) or
+    "random".
+    """
+
+    # Largest number of changed words to update letter counts one by one;
+    # larger changes are recounted from the positional index
+    RECOUNT = 256
+
+    def __init__(self, crossword, seed=None, value_order="lcv", restart=None):
+        """
+        Create new CSP crossword generate.
+        """
+        super().__init__(crossword)
+        if value_order not in ("lcv", "random"):
+            raise ValueError(f"unknown value order {value_order}")
+        self.seed = seed
+        self.value_order = value_order
+        self.random = random.Random(seed)
+
+        # Restart schedule, and the node count at which to restart next
+        self.restart = restart
+        self.budget = None
+        self.interrupted = False
+        self.restarts = 0
+
+        # Random keys breaking ties between equally good variables
+        self.tiebreak = {var: 0 for var in self.crossword.variables}
+        if seed is not None:
+            self.reorder()
+
+        # Previous domains of narrowed variables, as (variable, domain)
+        self.trail = []
+
+        # Words in the current assignment
+        self.used = set()
+
+        # Variables that share each word length
+        self.by_length = dict()
+        for var in self.crossword.variables:
+            self.by_length.setdefault(var.length, []).append(var)
+
+        # For each variable, a list over positions of dicts mapping each
+        # letter to the number of words in the domain with it there
+        self.counts = {
+            var: [
+                {
+                    letter: (words & self.domains[var]).bit_count()
+                    for letter, words
+                    in self.index.letters(var.length, position).items()
+                }
+                for position in range(var.length)
+            ]
+            for var in self.crossword.variables
+        }
+
+    def count(self, var, words, sign):
+        """
+        Add the letters of `words`, a bitset, to the letter counts of
+        `var` if `sign` is 1, or subtract them if `sign` is -1.
+        """
+        counts = self.counts[var]
+        if words.bit_count() <= self.RECOUNT:
+            for word in self.index.decode(var.length, words):
+                for position, letter in enumerate(word):
+                    counts[position][letter] += sign
+        else:
+            for position, letters in enumerate(counts):
+                index = self.index.letters(var.length, position)
+                for letter, bits in index.items():
+                    letters[letter] += sign * (bits & words).bit_count()
+
+    def narrow(self, var, domain):
+        """
+        Replace the domain of `var` by `domain`, recording the old domain
+        on the trail.
+        """
+        old = self.domains[var]
+        self.trail.append((var, old))
+        self.domains[var] = domain
+        self.count(var, old & ~domain, -1)
+
+    def mark(self):
+        """
+        Return a mark of the current search state, to `undo` back to.
+        """
+        return len(self.trail)
+
+    def undo(self, mark):
+        """
+        Restore every domain narrowed since the trail had length `mark`.
+        """
+        while len(self.trail) > mark:
+            var, domain = self.trail.pop()
+            self.count(var, domain & ~self.domains[var], 1)
+            self.domains[var] = domain
+
+    def order_domain_values(self, var, assignment):
+        """
+        Return a list of values in the domain of `var`, in order by
+        the number of values they rule out for neighboring variables,
+        looking the numbers up in the letter count tables.
+        """
+        neighbors = [
+            (i, self.counts[neighbor][j], self.domain_size(neighbor))
+            for neighbor, i, j in self.crossword.adjacency[var]
+            if neighbor not in assignment
+        ]
+
+        def eliminated(word):
+            return sum(
+                size - counts.get(word[i], 0) for i, counts, size in neighbors
+            )
+
+        words = self.domain_words(var)
+        if self.seed is not None or self.value_order == "random":
+            self.random.shuffle(words)
+        if self.value_order == "random":
+            return words
+        return sorted(words, key=eliminated)
+
+    def select_unassigned_variable(self, assignment):
+        """
+        Return an unassigned variable not already part of `assignment`,
+        with the fewest remaining values and, among those, the highest
+        degree. Remaining ties are broken by `self.tiebreak`.
+        """
+        unassigned = self.crossword.variables - assignment.keys()
+        return min(
+            unassigned,
+            key=lambda var: (self.domain_size(var),
+                             -len(self.crossword.adjacency[var]),
+                             self.tiebreak[var])
+        )
+
+    def reorder(self):
+        """
+        Draw new random keys to break ties between variables.
+        """
+        for var in self.tiebreak:
+            self.tiebreak[var] = self.random.random()
+
+    def out_of_budget(self):
+        """
+        Return True, and mark the search as interrupted, if the node
+        budget of the current restart is used up.
+        """
+        if self.budget is not None and self.nodes >= self.budget:
+            self.interrupted = True
+        return self.interrupted
+
+    def solve(self):
+        """
+        Enforce node and arc consistency, and then solve the CSP,
+        restarting the search according to the restart schedule.
+        """
+        self.enforce_node_consistency()
+        if not self.ac3():
+            return None
+
+        while True:
+            if self.restart is not None:
+                self.budget = self.nodes + self.restart * luby(self.restarts)
+            self.interrupted = False
+            result = self.backtrack(dict())
+            if not self.interrupted:
+                return result if isinstance(result, dict) else None
+            self.restarts += 1
+            self.reorder()
+
+    def consistent_word(self, var, word, assignment):
+        """
+        Return True if assigning `word` to `var` is consistent with
+        `assignment`, checking only the words in use and the neighbors
+        of `var`.
+        """
+        if word in self.used:
+            return False
+        for neighbor, i, j in self.crossword.adjacency[var]:
+            if neighbor in assignment and assignment[neighbor][j] != word[i]:
+                return False
+        return True
+
+    def infer(self, var, word, assignment):
+        """
+        Propagate the assignment of `word` to `var` to the other domains.
+        Return False if some domain is wiped out.
+        """
+        self.narrow(var, self.index.bit(word))
+        changed = [var]
+
+        # Each word can be used only once
+        bit = self.index.bit(word)
+        for other in self.by_length[var.length]:
+            if other is not var and other not in assignment:
+                if self.domains[other] & bit:
+                    self.narrow(other, self.domains[other] & ~bit)
+                    if not self.domains[other]:
+                        return False
+                    changed.append(other)
+
+        arcs = [
+            (neighbor, x)
+            for x in changed
+            for neighbor, _, _ in self.crossword.adjacency[x]
+        ]
+        return self.ac3(arcs)
+
+    def assign(self, var, word, assignment):
+        """
+        Add `var` = `word` to `assignment` and propagate it.
+        Return the mark to undo the assignment with, or None if the word
+        is inconsistent.
+        """
+        if not self.consistent_word(var, word, assignment):
+            return None
+        mark = self.mark()
+        assignment[var] = word
+        self.used.add(word)
+        if not self.infer(var, word, assignment):
+            self.unassign(var, assignment, mark)
+            return None
+        return mark
+
+    def unassign(self, var, assignment, mark):
+        """
+        Remove `var` from `assignment` and undo its propagation.
+        """
+        self.used.discard(assignment.pop(var))
+        self.undo(mark)
+
+    def backtrack(self, assignment):
+        """
+        Using Backtracking Search, maintaining arc consistency after each
+        assignment, return a complete assignment extending `assignment`,
+        or None if no assignment is possible.
+        """
+        if len(assignment) == len(self.crossword.variables):
+            return assignment
+
+        var = self.select_unassigned_variable(assignment)
+        for word in self.order_domain_values(var, assignment):
+            if self.out_of_budget():
+                return None
+            self.nodes += 1
+            mark = self.assign(var, word, assignment)
+            if mark is None:
+                continue
+            result = self.backtrack(assignment)
+            if result is not None:
+                return result
+            self.unassign(var, assignment, mark)
+
+        return None
+
+    def solutions(self, differ=1, exclude=()):
+        """
+        Yield successive complete assignments, lazily, each differing
+        from every assignment yielded before in at least `differ`
+        variables and using none of the words in `exclude`.
+
+        The search resumes where it left off after each solution.
+        """
+        self.enforce_node_consistency()
+
+        # Excluded words are removed from every domain up front
+        for word in exclude:
+            word = word.upper()
+            if self.index.find(word) is not None:
+                bit = self.index.bit(word)
+                for var in self.by_length.get(len(word), ()):
+                    if self.domains[var] & bit:
+                        self.narrow(var, self.domains[var] & ~bit)
+
+        if self.ac3():
+            yield from self.iter_solutions(dict(), [], differ)
+
+    def iter_solutions(self, assignment, found, differ):
+        """
+        Yield every complete assignment extending `assignment` that
+        differs from each assignment in `found` in at least `differ`
+        variables, adding them to `found`.
+        """
+        # Prune if some earlier solution can no longer be differed from
+        unassigned = len(self.crossword.variables) - len(assignment)
+        for solution in found:
+            different = sum(
+                solution[var] != word for var, word in assignment.items()
+            )
+            if different + unassigned < differ:
+                return
+
+        if not unassigned:
+            found.append(assignment.copy())
+            yield assignment.copy()
+            return
+
+        var = self.select_unassigned_variable(assignment)
+        for word in self.order_domain_values(var, assignment):
+            self.nodes += 1
+            mark = self.assign(var, word, assignment)
+            if mark is None:
+                continue
+            yield from self.iter_solutions(assignment, found, differ)
+            self.unassign(var, assignment, mark)
+
+
+def luby(i):
+    """
+    Return the `i`th element (0-indexed) of the Luby restart sequence.
+    """
+    size, exponent = 1, 0
+    while size < i + 1:
+        size = 2 * size + 1
+        exponent += 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        exponent -= 1
+        i = i % size
+    return 2 ** exponent
@@ -0,0 +1,187 @@
+import argparse
+import multiprocessing
+import queue
+import threading
+import time
+
+from crossword import Crossword
+from solvers import SOLVERS
+
+# Default search configurations, as (solver, options) pairs
+CONFIGURATIONS = [
+    ("mac", {}),
+    ("mac", {"seed": 1, "restart": 100}),
+    ("mac", {"seed": 2, "restart": 100, "value_order": "random"}),
+    ("backjump", {}),
+    ("backjump", {"seed": 3, "restart": 200}),
+]
+
+# Seconds between progress reports from each worker
+REPORT_INTERVAL = 0.1
+
+
+def run(index, crossword, solver, options, results, progress):
+    """
+    Solve `crossword` with one configuration, and report the outcome
+    on the `results` queue, or the error if the solver fails.
+
+    `progress` is a pair of shared values that the worker keeps updated
+    with its number of nodes and restarts, every `REPORT_INTERVAL`
+    seconds, so that they are known if it is stopped before finishing.
+    """
+    start = time.perf_counter()
+    nodes, restarts = progress
+    assignment = None
+    try:
+        creator = SOLVERS[solver](crossword, **options)
+        done = threading.Event()
+
+        def report():
+            while not done.wait(REPORT_INTERVAL):
+                nodes.value = creator.nodes
+                restarts.value = getattr(creator, "restarts", 0)
+
+        threading.Thread(target=report, daemon=True).start()
+        try:
+            assignment = creator.solve()
+        finally:
+            done.set()
+        outcome = {
+            "status": "solved" if assignment is not None else "no solution",
+            "nodes": creator.nodes,
+            "restarts": getattr(creator, "restarts", 0),
+        }
+    except Exception as exception:
+        outcome = {
+            "status": f"error: {exception!r}",
+            "nodes": nodes.value,
+            "restarts": restarts.value,
+        }
+    outcome["time"] = time.perf_counter() - start
+    results.put((index, assignment, outcome))
+
+
+def solve_portfolio(crossword, configurations=CONFIGURATIONS, budget=None):
+    """
+    Solve `crossword` with every configuration in parallel, one process
+    each, and return the first solution found together with a list of
+    statistics for each configuration.
+
+    The other workers are stopped as soon as one of them finishes, since
+    every configuration is complete: the first answer, solution or not,
+    is the answer. A worker that fails is not an answer, so the others
+    keep going until one of them answers or every worker has failed. If
+    `budget` seconds pass first, every worker is stopped and no solution
+    is returned.
+    """
+    results = multiprocessing.Queue()
+    progress = [
+        (multiprocessing.Value("q", 0), multiprocessing.Value("q", 0))
+        for _ in configurations
+    ]
+    workers = [
+        multiprocessing.Process(
+            target=run,
+            args=(index, crossword, solver, options, results,
+                  progress[index]),
+            daemon=True
+        )
+        for index, (solver, options) in enumerate(configurations)
+    ]
+    stats = [
+        {"solver": solver, "options": options, "status": "cancelled",
+         "nodes": None, "restarts": None, "time": None}
+        for solver, options in configurations
+    ]
+
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+
+    assignment = None
+    waiting = set(range(len(workers)))
+    try:
+        while waiting:
+            if budget is None:
+                timeout = REPORT_INTERVAL
+            else:
+                timeout = min(REPORT_INTERVAL,
+                              start + budget - time.perf_counter())
+                if timeout <= 0:
+                    for index in waiting:
+                        stats[index]["status"] = "timed out"
+                    break
+            try:
+                index, assignment, outcome = results.get(timeout=timeout)
+            except queue.Empty:
+
+                # A worker that exited without reporting has crashed, and
+                # anything it sent has arrived by the time it exited
+                for index in list(waiting):
+                    if not workers[index].is_alive() and results.empty():
+                        stats[index]["status"] = "crashed"
+                        waiting.discard(index)
+                continue
+            stats[index].update(outcome)
+            waiting.discard(index)
+            if not outcome["status"].startswith("error"):
+                break
+    finally:
+        elapsed = time.perf_counter() - start
+        for worker, entry, (nodes, restarts) in zip(workers, stats,
+                                                    progress):
+            if worker.is_alive():
+                worker.terminate()
+            elif worker.exitcode and entry["time"] is None:
+                entry["status"] = "crashed"
+            worker.join()
+            if entry["time"] is None:
+                entry["time"] = elapsed
+                entry["nodes"] = nodes.value
+                entry["restarts"] = restarts.value
+
+    return assignment, stats
+
+
+def main():
+
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(usage=(
+        "python portfolio.py structure words [output] [--budget SECONDS]"
+    ))
+    parser.add_argument("structure")
+    parser.add_argument("words")
+    parser.add_argument("output", nargs="?")
+    parser.add_argument("--budget", type=float,
+                        help="time budget in seconds")
+    args = parser.parse_args()
+
+    # Generate crossword
+    crossword = Crossword(args.structure, args.words)
+    assignment, stats = solve_portfolio(crossword, budget=args.budget)
+
+    # Print result
+    creator = SOLVERS["bitset"](crossword)
+    statuses = [entry["status"] for entry in stats]
+    if assignment is None and "no solution" in statuses:
+        print("No solution.")
+    elif assignment is None and "timed out" in statuses:
+        print("No answer within budget.")
+    elif assignment is None:
+        print("No answer: every worker failed.")
+    else:
+        creator.print(assignment)
+        if args.output:
+            creator.save(assignment, args.output)
+
+    # Print statistics for each worker
+    for entry in stats:
+        nodes = "-" if entry["nodes"] is None else entry["nodes"]
+        restarts = "-" if entry["restarts"] is None else entry["restarts"]
+        print(f"{entry['solver']:>9} {str(entry['options']):<50} "
+              f"{entry['status']:>12} {nodes:>8} {restarts:>5} "
+              f"{entry['time']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
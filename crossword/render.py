@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+class Renderer():
+    """
+    Draws crossword letter grids as images.
+
+    The font is loaded once, and each letter is drawn once onto a cell
+    tile, which is then pasted into every cell holding that letter.
+    """
+
+    def __init__(self, font_file="assets/fonts/OpenSans-Regular.ttf",
+                 font_size=80, cell_size=100, cell_border=2):
+        self.font_file = font_file
+        self.font_size = font_size
+        self.cell_size = cell_size
+        self.cell_border = cell_border
+        self.interior_size = cell_size - 2 * cell_border
+
+        # Font and letter -> tile, created on first use
+        self.font = None
+        self.tiles = dict()
+        self.lock = threading.Lock()
+
+    def tile(self, letter):
+        """
+        Return the image of a white cell holding `letter`, or of an empty
+        white cell if `letter` is None.
+        """
+        tile = self.tiles.get(letter)
+        if tile is not None:
+            return tile
+
+        with self.lock:
+            if letter in self.tiles:
+                return self.tiles[letter]
+            if self.font is None:
+                self.font = ImageFont.truetype(self.font_file, self.font_size)
+
+            # Cells span both border corners, as drawn by `rectangle`
+            size = self.interior_size + 1
+            tile = Image.new("RGBA", (size, size), "white")
+            if letter:
+                draw = ImageDraw.Draw(tile)
+                _, _, w, h = draw.textbbox((0, 0), letter, font=self.font)
+                draw.text(
+                    ((self.interior_size - w) / 2,
+                     (self.interior_size - h) / 2 - 10),
+                    letter, fill="black", font=self.font
+                )
+            self.tiles[letter] = tile
+            return tile
+
+    def render(self, crossword, letters):
+        """
+        Return the image of `crossword` filled with the 2D array `letters`.
+        """
+        img = Image.new(
+            "RGBA",
+            (crossword.width * self.cell_size,
+             crossword.height * self.cell_size),
+            "black"
+        )
+        for i in range(crossword.height):
+            for j in range(crossword.width):
+                if crossword.structure[i][j]:
+                    img.paste(self.tile(letters[i][j]), (
+                        j * self.cell_size + self.cell_border,
+                        i * self.cell_size + self.cell_border
+                    ))
+        return img
+
+    def save(self, crossword, letters, filename):
+        """
+        Save the image of `crossword` filled with `letters` to `filename`.
+        """
+        self.render(crossword, letters).save(filename)
+
+    def save_many(self, crossword, grids, filenames, workers=None):
+        """
+        Save the images of `crossword` filled with each of `grids` to the
+        matching `filenames`, using a pool of `workers` threads.
+        """
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [
+                executor.submit(self.save, crossword, letters, filename)
+                for letters, filename in zip(grids, filenames)
+            ]:
+                future.result()
+
+
+# Renderer shared by crossword creators
+renderer = Renderer()
@@ -0,0 +1,12 @@
+from generate import CrosswordCreator
+from bitset import BitsetCrosswordCreator
+from mac import MACCrosswordCreator
+from backjump import BackjumpCrosswordCreator
+
+# Maps solver names to crossword creator classes
+SOLVERS = {
+    "backtrack": CrosswordCreator,
+    "bitset": BitsetCrosswordCreator,
+    "mac": MACCrosswordCreator,
+    "backjump": BackjumpCrosswordCreator,
+}
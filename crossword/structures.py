@@ -0,0 +1,70 @@
+import random
+import sys
+
+
+def generate_structure(height, width, density, seed=None):
+    """
+    Return the rows of a random crossword structure of size `height` by
+    `width`, with "#" for blocked cells and "_" for open cells.
+
+    About `density` of the cells are blocked, and the structure has the
+    usual 180 degree rotational symmetry. Open cells that would not be
+    part of any word are blocked too.
+    """
+    if not 0 <= density <= 1:
+        raise ValueError("density must be between 0 and 1")
+    rng = random.Random(seed)
+
+    # Choose blocks for the first half of the cells, and mirror them
+    cells = height * width
+    blocked = [False] * cells
+    for k in range((cells + 1) // 2):
+        if rng.random() < density:
+            blocked[k] = blocked[cells - 1 - k] = True
+    grid = [blocked[i * width:(i + 1) * width] for i in range(height)]
+
+    # Block open cells with no open neighbor, which keeps the symmetry
+    def open_cell(i, j):
+        return 0 <= i < height and 0 <= j < width and not grid[i][j]
+
+    isolated = [
+        (i, j)
+        for i in range(height)
+        for j in range(width)
+        if open_cell(i, j) and not any(
+            open_cell(i + di, j + dj)
+            for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1))
+        )
+    ]
+    for i, j in isolated:
+        grid[i][j] = True
+
+    return ["".join("#" if cell else "_" for cell in row) for row in grid]
+
+
+def write_structure(filename, rows):
+    """
+    Write the rows of a structure to `filename`.
+    """
+    with open(filename, "w") as f:
+        f.write("\n".join(rows) + "\n")
+
+
+def main():
+
+    # Check usage
+    if len(sys.argv) not in [4, 5]:
+        sys.exit("Usage: python structures.py height width density [seed]")
+
+    height = int(sys.argv[1])
+    width = int(sys.argv[2])
+    density = float(sys.argv[3])
+    seed = int(sys.argv[4]) if len(sys.argv) == 5 else None
+
+    # Print structure
+    for row in generate_structure(height, width, density, seed):
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
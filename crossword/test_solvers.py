@@ -0,0 +1,59 @@
+import os
+import random
+import tempfile
+import unittest
+
+from crossword import Crossword
+from solvers import SOLVERS
+from structures import generate_structure, write_structure
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class SolverAgreementTest(unittest.TestCase):
+    """
+    Cross-check the bitset solver against MAC on random grids.
+    """
+
+    def check(self, crossword, assignment):
+        """
+        Assert that `assignment` fills `crossword` correctly.
+        """
+        self.assertEqual(set(assignment), crossword.variables)
+        self.assertEqual(len(set(assignment.values())), len(assignment))
+        for var, word in assignment.items():
+            self.assertEqual(len(word), var.length)
+            self.assertIn(word, crossword.words)
+            for other, i, j in crossword.adjacency[var]:
+                self.assertEqual(word[i], assignment[other][j])
+
+    def test_bitset_agrees_with_mac(self):
+        rng = random.Random(0)
+        with tempfile.TemporaryDirectory() as directory:
+
+            # Every tenth word of the large vocabulary leaves a mix of
+            # solvable and unsolvable small grids
+            words_file = os.path.join(directory, "words.txt")
+            with open(os.path.join(DATA, "words2.txt")) as f:
+                words = sorted(set(f.read().upper().splitlines()))
+            with open(words_file, "w") as f:
+                f.write("\n".join(words[::10]))
+
+            structure_file = os.path.join(directory, "structure.txt")
+            for seed in range(60):
+                size = rng.choice([3, 4, 5])
+                density = rng.choice([0.2, 0.3, 0.4])
+                write_structure(structure_file, generate_structure(
+                    size, size, density, seed=seed
+                ))
+                crossword = Crossword(structure_file, words_file)
+                expected = SOLVERS["mac"](crossword).solve()
+                assignment = SOLVERS["bitset"](crossword).solve()
+                with self.subTest(seed=seed, size=size, density=density):
+                    self.assertEqual(assignment is None, expected is None)
+                    if assignment is not None:
+                        self.check(crossword, assignment)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from logic import model_check, model_check_bitwise, model_check_pruned
+from sat import KnowledgeBase, sat_check
+
+# Maps backend names to functions checking if knowledge entails query
+BACKENDS = {
+    "enumerate": model_check,
+    "pruned": model_check_pruned,
+    "bitwise": model_check_bitwise,
+    "sat": sat_check,
+}
+
+
+def check_group(knowledge, queries, backend):
+    """Checks each query against the same knowledge base."""
+    if backend == "sat":
+        kb = KnowledgeBase(knowledge)
+        return [kb.entails(query) for query in queries]
+    check = BACKENDS[backend]
+    return [check(knowledge, query) for query in queries]
+
+
+def entail_many(pairs, backend="sat", processes=None):
+    """
+    Checks a list of `(knowledge, query)` pairs with the given backend,
+    and returns the list of results in the same order.
+
+    Pairs with equal knowledge bases are grouped, so that each knowledge
+    base is pickled and compiled only once per task. The SAT backend
+    checks a group in one task, since it compiles the knowledge base
+    once for all of its queries. Other backends split a group's queries
+    into one chunk per worker, so a single puzzle is spread over the
+    pool too. Tasks are run in a pool of `processes` worker processes,
+    by default one per CPU, or inline if `processes` is 1.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend}")
+    workers = processes or os.cpu_count() or 1
+
+    # Group queries by knowledge base, remembering their positions
+    groups = dict()
+    for position, (knowledge, query) in enumerate(pairs):
+        if knowledge not in groups:
+            groups[knowledge] = ([], [])
+        groups[knowledge][0].append(query)
+        groups[knowledge][1].append(position)
+
+    # Split the groups into tasks of (knowledge, queries, positions)
+    tasks = []
+    for knowledge, (queries, positions) in groups.items():
+        if backend == "sat":
+            size = len(queries)
+        else:
+            size = math.ceil(len(queries) / workers)
+        for start in range(0, len(queries), size):
+            tasks.append((knowledge, queries[start:start + size],
+                          positions[start:start + size]))
+
+    results = [None] * len(pairs)
+    if workers == 1 or len(tasks) <= 1:
+        outcomes = [
+            check_group(knowledge, queries, backend)
+            for knowledge, queries, _ in tasks
+        ]
+    else:
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [
+                executor.submit(check_group, knowledge, queries, backend)
+                for knowledge, queries, _ in tasks
+            ]
+            outcomes = [future.result() for future in futures]
+
+    for (_, _, positions), outcome in zip(tasks, outcomes):
+        for position, result in zip(positions, outcome):
+            results[position] = result
+    return results
@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+
+from batch import BACKENDS, entail_many
+from generator import generate_puzzle
+
+# Largest number of symbols each backend is benchmarked with
+LIMITS = {
+    "enumerate": 16,
+    "pruned": 32,
+    "bitwise": 20,
+    "sat": None,
+}
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [max_speakers] [processes]")
+    max_speakers = int(sys.argv[1]) if len(sys.argv) >= 2 else 1024
+    pool = int(sys.argv[2]) if len(sys.argv) == 3 else os.cpu_count()
+
+    # Every backend is timed inline, and the backends that split a puzzle
+    # over the pool are also timed in a pool of `pool` processes
+    backends = list(BACKENDS)
+    runs = [(backend, 1) for backend in backends] + [
+        (backend, pool) for backend in backends if backend != "sat"
+    ]
+    print(f"Columns marked * use a pool of {pool} processes")
+    print(f"{'speakers':>8}" + "".join(
+        f"{backend + ('' if processes == 1 else '*'):>12}"
+        for backend, processes in runs
+    ))
+
+    speakers = 2
+    while speakers <= max_speakers:
+        knowledge, symbols = generate_puzzle(speakers, seed=speakers)
+        pairs = [(knowledge, symbol) for symbol in symbols]
+
+        row = f"{speakers:>8}"
+        expected = None
+        for backend, processes in runs:
+            limit = LIMITS[backend]
+            if limit is not None and len(symbols) > limit:
+                row += f"{'-':>12}"
+                continue
+
+            start = time.perf_counter()
+            results = entail_many(pairs, backend, processes=processes)
+            elapsed = time.perf_counter() - start
+
+            # Every backend must agree on the answers
+            if expected is None:
+                expected = results
+            elif results != expected:
+                sys.exit(f"{backend} disagrees on {speakers} speakers")
+            row += f"{elapsed:>11.4f}s"
+
+        print(row)
+        speakers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import random
+import string
+
+from logic import *
+
+
+def speaker_name(k):
+    """Returns the name of the `k`th speaker: A, B, ..., Z, P26, P27, ..."""
+    return string.ascii_uppercase[k] if k < 26 else f"P{k}"
+
+
+def generate_puzzle(n, seed=None):
+    """
+    Generates a random knights and knaves puzzle with `n` speakers.
+
+    Each speaker makes one statement about the kinds of some speakers.
+    The statements are chosen to be consistent with a hidden assignment
+    of kinds, so the knowledge base always has at least one model.
+
+    Returns the knowledge base and the list of all knight and knave
+    symbols, which are the natural queries for the puzzle.
+    """
+    rng = random.Random(seed)
+    knights = [Symbol(f"{speaker_name(k)} is a Knight") for k in range(n)]
+    knaves = [Symbol(f"{speaker_name(k)} is a Knave") for k in range(n)]
+    hidden = {
+        symbol.name: rng.random() < 0.5 for symbol in knights
+    }
+    for knight, knave in zip(knights, knaves):
+        hidden[knave.name] = not hidden[knight.name]
+
+    def claim():
+        """Returns a random claim about the kind of one speaker."""
+        k = rng.randrange(n)
+        return rng.choice((knights, knaves))[k]
+
+    def statement():
+        """Returns a random statement about one or two speakers."""
+        kind = rng.randrange(4)
+        if kind == 0:
+            return claim()
+        elif kind == 1:
+            return And(claim(), claim())
+        elif kind == 2:
+            return Or(claim(), claim())
+        else:
+            return Biconditional(
+                knights[rng.randrange(n)], knights[rng.randrange(n)]
+            )
+
+    knowledge = And()
+    for knight, knave in zip(knights, knaves):
+        knowledge.add(Or(knight, knave))
+        knowledge.add(Not(And(knight, knave)))
+
+    for knight, knave in zip(knights, knaves):
+
+        # Knights say true statements and knaves say false ones
+        said = statement()
+        if said.evaluate(hidden) != hidden[knight.name]:
+            said = Not(said)
+        knowledge.add(Implication(knight, said))
+        knowledge.add(Implication(knave, Not(said)))
+
+    return knowledge, knights + knaves
@@ -3,17 +3,120 @@ import itertools
 
 class Sentence():
 
+    __slots__ = ("_hash", "_symbols")
+
+    # Each sentence caches its hash and symbols when first asked for
+    # them, in slots left unset until then, which assumes its
+    # subsentences are not modified afterwards; `And.add` clears the
+    # cache of the conjunction it grows
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = self.compute_hash()
+            return self._hash
+
+    def __getstate__(self):
+        # Cached hashes are not valid in another process
+        return {
+            name: getattr(self, name)
+            for cls in type(self).__mro__[:-1]
+            for name in cls.__slots__ if not name.startswith("_")
+        }
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def clear_cache(self):
+        """Forgets the cached hash and symbols of the sentence."""
+        for name in ("_hash", "_symbols"):
+            if hasattr(self, name):
+                delattr(self, name)
+
+    def compute_hash(self):
+        return object.__hash__(self)
+
+    def symbol_set(self):
+        """Returns the cached frozenset of symbols in the sentence."""
+        try:
+            return self._symbols
+        except AttributeError:
+            self._symbols = self.compute_symbols()
+            return self._symbols
+
+    def compute_symbols(self):
+        symbols = set()
+        for child in self.children():
+            symbols.update(child.symbol_set())
+        return frozenset(symbols)
+
+    def children(self):
+        """Returns the immediate subsentences of the logical sentence."""
+        return ()
+
+    def code(self, operands, index):
+        """
+        Returns a Python expression evaluating the logical sentence,
+        given expressions for its children and a map of symbols to
+        positions in the model tuple `m`.
+        """
+        raise Exception("nothing to evaluate")
+
+    def compile(self, symbols):
+        """
+        Compiles the logical sentence into a function that takes a tuple
+        of truth values, ordered as `symbols`, and evaluates the sentence.
+        Equal subsentences are only evaluated once.
+        """
+        index = {symbol: i for i, symbol in enumerate(symbols)}
+        names = dict()
+        lines = []
+
+        def visit(sentence):
+            if sentence not in names:
+                operands = [visit(child) for child in sentence.children()]
+                name = f"t{len(names)}"
+                lines.append(f"    {name} = {sentence.code(operands, index)}")
+                names[sentence] = name
+            return names[sentence]
+
+        result = visit(self)
+        source = "\n".join(
+            ["def evaluate(m):"] + lines + [f"    return bool({result})"]
+        )
+        namespace = dict()
+        exec(source, namespace)
+        return namespace["evaluate"]
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence in a partial model.
+        Returns True or False if the value is decided by the symbols in
+        `model`, or None if it depends on unassigned symbols.
+        """
+        raise Exception("nothing to evaluate")
+
+    def truth_table(self, tables, mask):
+        """
+        Evaluates the logical sentence in every model at once.
+        `tables` maps each symbol to an int whose bit k is the symbol's
+        value in model k, and `mask` has one bit set per model.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
 
     @classmethod
     def validate(cls, sentence):
@@ -44,15 +147,22 @@ class Sentence():
 
 class Symbol(Sentence):
 
+    __slots__ = ("name",)
+
     def __init__(self, name):
         self.name = name
 
     def __eq__(self, other):
         return isinstance(other, Symbol) and self.name == other.name
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("symbol", self.name))
 
+    def compute_symbols(self):
+        return frozenset([self.name])
+
     def __repr__(self):
         return self.name
 
@@ -62,14 +172,30 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
+    def truth_table(self, tables, mask):
+        try:
+            return tables[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
+    def code(self, operands, index):
+        try:
+            return f"m[{index[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
-
 
 class Not(Sentence):
+
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
         Sentence.validate(operand)
         self.operand = operand
@@ -77,23 +203,38 @@ class Not(Sentence):
     def __eq__(self, other):
         return isinstance(other, Not) and self.operand == other.operand
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("not", hash(self.operand)))
 
+    def children(self):
+        return (self.operand,)
+
     def __repr__(self):
         return f"Not({self.operand})"
 
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
+    def truth_table(self, tables, mask):
+        return ~self.operand.truth_table(tables, mask) & mask
+
+    def code(self, operands, index):
+        return f"not {operands[0]}"
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
-
 
 class And(Sentence):
+
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
@@ -102,11 +243,16 @@ class And(Sentence):
     def __eq__(self, other):
         return isinstance(other, And) and self.conjuncts == other.conjuncts
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
         )
 
+    def children(self):
+        return self.conjuncts
+
     def __repr__(self):
         conjunctions = ", ".join(
             [str(conjunct) for conjunct in self.conjuncts]
@@ -116,21 +262,41 @@ class And(Sentence):
     def add(self, conjunct):
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        self.clear_cache()
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            elif value is None:
+                result = None
+        return result
+
+    def truth_table(self, tables, mask):
+        table = mask
+        for conjunct in self.conjuncts:
+            table &= conjunct.truth_table(tables, mask)
+        return table
+
+    def code(self, operands, index):
+        return " and ".join(operands) or "True"
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
-
 
 class Or(Sentence):
+
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
@@ -139,11 +305,16 @@ class Or(Sentence):
     def __eq__(self, other):
         return isinstance(other, Or) and self.disjuncts == other.disjuncts
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
         )
 
+    def children(self):
+        return self.disjuncts
+
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
@@ -151,17 +322,36 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            elif value is None:
+                result = None
+        return result
+
+    def truth_table(self, tables, mask):
+        table = 0
+        for disjunct in self.disjuncts:
+            table |= disjunct.truth_table(tables, mask)
+        return table
+
+    def code(self, operands, index):
+        return " or ".join(operands) or "False"
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
-
 
 class Implication(Sentence):
+
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
@@ -173,9 +363,14 @@ class Implication(Sentence):
                 and self.antecedent == other.antecedent
                 and self.consequent == other.consequent)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("implies", hash(self.antecedent), hash(self.consequent)))
 
+    def children(self):
+        return (self.antecedent, self.consequent)
+
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
@@ -183,16 +378,35 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is None or consequent is None:
+            return None
+        return False
+
+    def truth_table(self, tables, mask):
+        antecedent = self.antecedent.truth_table(tables, mask)
+        consequent = self.consequent.truth_table(tables, mask)
+        return (~antecedent | consequent) & mask
+
+    def code(self, operands, index):
+        return f"not {operands[0]} or {operands[1]}"
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
-
 
 class Biconditional(Sentence):
+
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
@@ -204,60 +418,299 @@ class Biconditional(Sentence):
                 and self.left == other.left
                 and self.right == other.right)
 
-    def __hash__(self):
+    __hash__ = Sentence.__hash__
+
+    def compute_hash(self):
         return hash(("biconditional", hash(self.left), hash(self.right)))
 
+    def children(self):
+        return (self.left, self.right)
+
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
+
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
+
+    def truth_table(self, tables, mask):
+        left = self.left.truth_table(tables, mask)
+        right = self.right.truth_table(tables, mask)
+        return ~(left ^ right) & mask
+
+    def code(self, operands, index):
+        return f"{operands[0]} == {operands[1]}"
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
 
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+    # Get all symbols in both knowledge and query
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()), key=str)
 
-        # If model has an assignment for each symbol
-        if not symbols:
+    # Compile both sentences over the same symbol order
+    knowledge = knowledge.compile(symbols)
+    query = query.compile(symbols)
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
+    # If knowledge base is true in a model, then query must also be true
+    for model in itertools.product((True, False), repeat=len(symbols)):
+        if knowledge(model) and not query(model):
+            return False
+    return True
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+def model_check_pruned(knowledge, query):
+    """
+    Checks if knowledge base entails query, skipping every branch of the
+    model enumeration where the answer is decided by a partial model.
+    """
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
+    def check_all(knowledge, query, order, model):
+        """Checks if knowledge base entails query, given a partial model."""
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+        # If knowledge base is false, no extension can be a counterexample
+        value = knowledge.evaluate_partial(model)
+        if value is False:
+            return True
 
-    # Get all symbols in both knowledge and query
+        # If query is true, it holds in every extension
+        result = query.evaluate_partial(model)
+        if result is True:
+            return True
+        if value is True and result is False:
+            return False
+
+        # Assign the next symbol in place, trying both values
+        p = order[len(model)]
+        for truth in (True, False):
+            model[p] = truth
+            if not check_all(knowledge, query, order, model):
+                del model[p]
+                return False
+        del model[p]
+        return True
+
+    # Count symbol occurrences across both sentences
+    counts = dict()
+    stack = [knowledge, query]
+    while stack:
+        sentence = stack.pop()
+        if isinstance(sentence, Symbol):
+            counts[sentence.name] = counts.get(sentence.name, 0) + 1
+        else:
+            stack.extend(sentence.children())
+
+    # Branch on the most frequent symbols first
+    order = sorted(counts, key=lambda symbol: (-counts[symbol], str(symbol)))
+    return check_all(knowledge, query, order, dict())
+
+
+def symbol_tables(symbols):
+    """
+    Assigns each symbol a bit pattern over all 2^n models of `symbols`.
+    Returns a dict mapping symbol names to patterns, and the mask of
+    all models.
+    """
+    symbols = sorted(symbols, key=str)
+    size = 2 ** len(symbols)
+    mask = (1 << size) - 1
+    tables = dict()
+    for i, symbol in enumerate(symbols):
+
+        # Symbol i is true in models whose index has bit i set, so its
+        # pattern repeats 2^i zeros followed by 2^i ones
+        period = 2 ** (i + 1)
+        block = ((1 << 2 ** i) - 1) << 2 ** i
+        tables[symbol] = mask // ((1 << period) - 1) * block
+    return tables, mask
+
+
+def model_check_bitwise(knowledge, query):
+    """
+    Checks if knowledge base entails query, evaluating the whole
+    truth table of both sentences with bitwise operations.
+    """
     symbols = set.union(knowledge.symbols(), query.symbols())
-
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    tables, mask = symbol_tables(symbols)
+    knowledge = knowledge.truth_table(tables, mask)
+    query = query.truth_table(tables, mask)
+
+    # Entailment fails if some model satisfies knowledge but not query
+    return knowledge & ~query == 0
+
+
+class SentenceDAG():
+    """
+    Factory for hash-consed sentences.
+
+    Structurally equal sentences built through the same factory are the
+    same object, so repeated subformulas are stored and evaluated once.
+    Sentences are simplified as they are built: nested conjunctions and
+    disjunctions are flattened, duplicates removed and constants folded.
+    The empty conjunction `self.true` and the empty disjunction
+    `self.false` stand for the constants.
+
+    Sentences returned by the factory are shared, and must not be
+    modified in place (e.g. with `And.add`).
+    """
+
+    def __init__(self):
+        self.nodes = dict()
+        self.true = self.node(And, ())
+        self.false = self.node(Or, ())
+
+    def node(self, cls, children):
+        """Returns the unique sentence of type `cls` with these children."""
+        key = (cls, tuple(id(child) for child in children))
+        if key not in self.nodes:
+            self.nodes[key] = cls(*children)
+        return self.nodes[key]
+
+    def symbol(self, name):
+        key = (Symbol, name)
+        if key not in self.nodes:
+            self.nodes[key] = Symbol(name)
+        return self.nodes[key]
+
+    def negate(self, operand):
+        if operand is self.true:
+            return self.false
+        if operand is self.false:
+            return self.true
+        if isinstance(operand, Not):
+            return operand.operand
+        return self.node(Not, (operand,))
+
+    def conjoin(self, *conjuncts):
+        return self.combine(And, conjuncts, self.true, self.false)
+
+    def disjoin(self, *disjuncts):
+        return self.combine(Or, disjuncts, self.false, self.true)
+
+    def combine(self, cls, operands, identity, absorbing):
+        """
+        Builds a flattened conjunction or disjunction, where `identity`
+        can be dropped and `absorbing` decides the whole sentence.
+        """
+        children = dict()
+        stack = list(reversed(operands))
+        while stack:
+            operand = stack.pop()
+            if type(operand) is cls and operand is not identity:
+                stack.extend(reversed(operand.children()))
+            elif operand is absorbing:
+                return absorbing
+            elif operand is not identity:
+                children[id(operand)] = operand
+
+        # A sentence together with its negation is also absorbing
+        for child in children.values():
+            if isinstance(child, Not) and id(child.operand) in children:
+                return absorbing
+
+        if len(children) == 1:
+            return next(iter(children.values()))
+        return self.node(cls, tuple(children.values()))
+
+    def implies(self, antecedent, consequent):
+        if antecedent is self.true:
+            return consequent
+        if consequent is self.false:
+            return self.negate(antecedent)
+        if (antecedent is self.false or consequent is self.true
+                or antecedent is consequent):
+            return self.true
+        return self.node(Implication, (antecedent, consequent))
+
+    def complementary(self, a, b):
+        """
+        Checks if `a` is the negation of `b`, without building any node.
+        """
+        if isinstance(a, Not) and a.operand is b:
+            return True
+        if isinstance(b, Not) and b.operand is a:
+            return True
+        return ((a is self.true and b is self.false)
+                or (a is self.false and b is self.true))
+
+    def iff(self, left, right):
+        if left is right:
+            return self.true
+        if self.complementary(left, right):
+            return self.false
+        for a, b in ((left, right), (right, left)):
+            if a is self.true:
+                return b
+            if a is self.false:
+                return self.negate(b)
+        return self.node(Biconditional, (left, right))
+
+    def intern(self, sentence):
+        """Returns the simplified, hash-consed equivalent of `sentence`."""
+        memo = dict()
+
+        def visit(sentence):
+            if id(sentence) in memo:
+                return memo[id(sentence)]
+            if isinstance(sentence, Symbol):
+                result = self.symbol(sentence.name)
+            else:
+                children = [visit(child) for child in sentence.children()]
+                if isinstance(sentence, Not):
+                    result = self.negate(*children)
+                elif isinstance(sentence, And):
+                    result = self.conjoin(*children)
+                elif isinstance(sentence, Or):
+                    result = self.disjoin(*children)
+                elif isinstance(sentence, Implication):
+                    result = self.implies(*children)
+                elif isinstance(sentence, Biconditional):
+                    result = self.iff(*children)
+                else:
+                    raise TypeError("must be a logical sentence")
+            memo[id(sentence)] = result
+            return result
+
+        return visit(sentence)
+
+    @staticmethod
+    def evaluate(sentence, model):
+        """
+        Evaluates `sentence` in `model`, evaluating each shared
+        subsentence only once.
+        """
+        memo = dict()
+
+        def visit(sentence):
+            key = id(sentence)
+            if key not in memo:
+                if isinstance(sentence, Symbol):
+                    memo[key] = sentence.evaluate(model)
+                elif isinstance(sentence, Not):
+                    memo[key] = not visit(sentence.operand)
+                elif isinstance(sentence, And):
+                    memo[key] = all(visit(c) for c in sentence.conjuncts)
+                elif isinstance(sentence, Or):
+                    memo[key] = any(visit(d) for d in sentence.disjuncts)
+                elif isinstance(sentence, Implication):
+                    memo[key] = (not visit(sentence.antecedent)
+                                 or visit(sentence.consequent))
+                else:
+                    memo[key] = (visit(sentence.left)
+                                 == visit(sentence.right))
+            return memo[key]
+
+        return visit(sentence)
@@ -0,0 +1,446 @@
+import heapq
+
+from logic import Sentence, Symbol, Not, And, Or, Implication, Biconditional
+
+
+class Solver():
+    """
+    CDCL satisfiability solver over clauses in DIMACS-style notation.
+
+    Variables are positive integers returned by `new_var`, and a literal
+    is either a variable `v` (true) or its negation `-v` (false).
+    """
+
+    def __init__(self):
+        self.num_vars = 0
+
+        # Per-variable state, indexed by variable (index 0 is unused)
+        self.values = [None]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.polarity = [False]
+
+        # Watch lists, indexed by `2 * var + (literal < 0)`
+        self.watches = [[], []]
+
+        # Assigned literals in chronological order, and where each
+        # decision level starts in the trail
+        self.trail = []
+        self.trail_limits = []
+        self.queue_head = 0
+
+        # Variable order heap of (-activity, var) entries
+        self.order = []
+        self.increment = 1.0
+
+        self.clauses = []
+        self.learnts = []
+        self.ok = True
+        self.model = None
+        self.conflicts = 0
+
+    def new_var(self):
+        """Adds a fresh variable and returns it."""
+        self.num_vars += 1
+        var = self.num_vars
+        self.values.append(None)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.polarity.append(False)
+        self.watches.append([])
+        self.watches.append([])
+        heapq.heappush(self.order, (0.0, var))
+        return var
+
+    def value(self, literal):
+        """Returns the truth value of a literal, or None if unassigned."""
+        value = self.values[abs(literal)]
+        if value is None:
+            return None
+        return value == (literal > 0)
+
+    def add_clause(self, literals):
+        """
+        Adds a clause to the solver at the root level.
+        Returns False if the clause set became trivially unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+
+        # Drop duplicates and false literals, skip satisfied clauses
+        clause = []
+        for literal in literals:
+            value = self.value(literal)
+            if value is True or -literal in clause:
+                return True
+            if value is None and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(clause)
+            self.clauses.append(clause)
+        return self.ok
+
+    def attach(self, clause):
+        """Watches the first two literals of a clause."""
+        self.watches[self.index(clause[0])].append(clause)
+        self.watches[self.index(clause[1])].append(clause)
+
+    @staticmethod
+    def index(literal):
+        return 2 * literal if literal > 0 else -2 * literal + 1
+
+    def decision_level(self):
+        return len(self.trail_limits)
+
+    def enqueue(self, literal, reason):
+        """Assigns a literal true at the current decision level."""
+        var = abs(literal)
+        self.values[var] = literal > 0
+        self.levels[var] = self.decision_level()
+        self.reasons[var] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Performs unit propagation over the watch lists.
+        Returns a conflicting clause, or None if there is no conflict.
+        """
+        values = self.values
+        while self.queue_head < len(self.trail):
+            literal = self.trail[self.queue_head]
+            self.queue_head += 1
+            false_literal = -literal
+            position = self.index(false_literal)
+            watchers = self.watches[position]
+            self.watches[position] = kept = []
+
+            for k, clause in enumerate(watchers):
+
+                # Make sure the false literal is the second watch
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                first = clause[0]
+                value = values[abs(first)]
+                if value is not None and value == (first > 0):
+                    kept.append(clause)
+                    continue
+
+                # Look for a new literal to watch
+                for m in range(2, len(clause)):
+                    other = clause[m]
+                    value = values[abs(other)]
+                    if value is None or value == (other > 0):
+                        clause[1], clause[m] = other, false_literal
+                        self.watches[self.index(other)].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    value = values[abs(first)]
+
+                    # Clause is falsified: keep the remaining watchers
+                    if value is not None:
+                        kept.extend(watchers[k + 1:])
+                        self.queue_head = len(self.trail)
+                        return clause
+
+                    # Clause is unit: its first literal is implied
+                    self.enqueue(first, clause)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Derives a first-UIP learnt clause from a conflict.
+        Returns the clause (asserting literal first) and the backjump level.
+        """
+        seen = set()
+        learnt = [None]
+        counter = 0
+        literal = None
+        clause = conflict
+        position = len(self.trail) - 1
+        level = self.decision_level()
+
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                var = abs(other)
+                if var not in seen and self.levels[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.levels[var] == level:
+                        counter += 1
+                    else:
+                        learnt.append(other)
+
+            # Walk back to the next literal involved in the conflict
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            var = abs(literal)
+            seen.discard(var)
+            clause = self.reasons[var]
+            counter -= 1
+            if counter == 0:
+                break
+
+        learnt[0] = -literal
+
+        # Backjump to the second highest level, watching that literal
+        if len(learnt) == 1:
+            return learnt, 0
+        best = max(range(1, len(learnt)),
+                   key=lambda k: self.levels[abs(learnt[k])])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def bump(self, var):
+        """Increases the activity of a variable involved in a conflict."""
+        self.activity[var] += self.increment
+        if self.activity[var] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-self.activity[v], v)
+                          for v in range(1, self.num_vars + 1)
+                          if self.values[v] is None]
+            heapq.heapify(self.order)
+        elif self.values[var] is None:
+            heapq.heappush(self.order, (-self.activity[var], var))
+
+    def cancel_until(self, level):
+        """Undoes all assignments above decision level `level`."""
+        if self.decision_level() <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            var = abs(literal)
+            self.values[var] = None
+            self.reasons[var] = None
+            self.polarity[var] = literal > 0
+            heapq.heappush(self.order, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.queue_head = len(self.trail)
+
+    def pick_branch(self):
+        """Returns the unassigned variable with highest activity, or None."""
+        while self.order:
+            activity, var = heapq.heappop(self.order)
+            if self.values[var] is None and -activity == self.activity[var]:
+                return var
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses are satisfiable together with the
+        given assumption literals, False otherwise.
+        After a satisfiable call, `self.model` maps each variable to a bool.
+        Learnt clauses are kept between calls.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+
+        restart = 0
+        while True:
+            status = self.search(assumptions, 100 * luby(restart))
+            if status is not None:
+                self.cancel_until(0)
+                return status
+            restart += 1
+
+    def search(self, assumptions, budget):
+        """
+        Runs CDCL until a result is found or `budget` conflicts occur.
+        Returns True, False, or None when the search should restart.
+        """
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if self.decision_level() == 0:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.cancel_until(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.attach(learnt)
+                    self.learnts.append(learnt)
+                    self.enqueue(learnt[0], learnt)
+                self.increment *= 1.05
+                continue
+
+            if conflicts >= budget:
+                self.cancel_until(0)
+                return None
+
+            # Assumptions are decided first, one decision level each
+            literal = None
+            while self.decision_level() < len(assumptions):
+                assumption = assumptions[self.decision_level()]
+                value = self.value(assumption)
+                if value is True:
+                    self.trail_limits.append(len(self.trail))
+                elif value is False:
+                    return False
+                else:
+                    literal = assumption
+                    break
+
+            if literal is None:
+                var = self.pick_branch()
+                if var is None:
+                    self.model = {
+                        v: self.values[v] for v in range(1, self.num_vars + 1)
+                    }
+                    return True
+                literal = var if self.polarity[var] else -var
+
+            self.trail_limits.append(len(self.trail))
+            self.enqueue(literal, None)
+
+
+def luby(i):
+    """Returns the `i`th element (0-indexed) of the Luby restart sequence."""
+    size, exponent = 1, 0
+    while size < i + 1:
+        size = 2 * size + 1
+        exponent += 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        exponent -= 1
+        i = i % size
+    return 2 ** exponent
+
+
+class Encoder():
+    """
+    Tseitin encoder from logical sentences to clauses of a `Solver`.
+
+    Every compound sentence gets a fresh variable defined to be
+    equivalent to it, so the clause set grows linearly with the
+    size of the sentence. Equal subsentences share one variable.
+    """
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.variables = dict()
+        self.definitions = dict()
+        self.true = None
+
+    def variable(self, name):
+        """Returns the solver variable for the symbol named `name`."""
+        if name not in self.variables:
+            self.variables[name] = self.solver.new_var()
+        return self.variables[name]
+
+    def constant(self):
+        """Returns a literal that is always true."""
+        if self.true is None:
+            self.true = self.solver.new_var()
+            self.solver.add_clause([self.true])
+        return self.true
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to `sentence`, adding definitions."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.definitions:
+            return self.definitions[sentence]
+
+        clauses = []
+        if isinstance(sentence, And):
+            if not sentence.conjuncts:
+                return self.constant()
+            parts = [self.literal(c) for c in sentence.conjuncts]
+            x = self.solver.new_var()
+            clauses.extend([-x, part] for part in parts)
+            clauses.append([x] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            if not sentence.disjuncts:
+                return -self.constant()
+            parts = [self.literal(d) for d in sentence.disjuncts]
+            x = self.solver.new_var()
+            clauses.extend([x, -part] for part in parts)
+            clauses.append([-x] + parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            x = self.solver.new_var()
+            clauses.extend([[-x, -a, b], [x, a], [x, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            x = self.solver.new_var()
+            clauses.extend([[-x, -a, b], [-x, a, -b], [x, a, b], [x, -a, -b]])
+        else:
+            raise TypeError(f"cannot encode {type(sentence).__name__}")
+
+        for clause in clauses:
+            self.solver.add_clause(clause)
+        self.definitions[sentence] = x
+        return x
+
+    def assert_sentence(self, sentence):
+        """Adds `sentence` as a fact, splitting top-level conjunctions."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.assert_sentence(conjunct)
+        else:
+            self.solver.add_clause([self.literal(sentence)])
+
+
+class KnowledgeBase():
+    """
+    Knowledge base that compiles its sentences once and answers
+    entailment queries incrementally.
+
+    Each query is solved under the assumption that it is false, so the
+    solver state, including learnt clauses, is reused between queries.
+    """
+
+    def __init__(self, *sentences):
+        self.solver = Solver()
+        self.encoder = Encoder(self.solver)
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base without recompiling."""
+        Sentence.validate(sentence)
+        self.encoder.assert_sentence(sentence)
+
+    def consistent(self):
+        """Returns True if the knowledge base has at least one model."""
+        return self.solver.solve()
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        Sentence.validate(query)
+        return not self.solver.solve([-self.encoder.literal(query)])
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by showing that
+    knowledge ∧ ¬query is unsatisfiable.
+    """
+    return KnowledgeBase(knowledge).entails(query)
@@ -0,0 +1,170 @@
+import numpy as np
+
+
+class Board():
+    """
+    Array-backed Minesweeper game representation, with the interface of
+    `Minesweeper`, for boards with millions of cells.
+
+    Mines are placed with a single draw, and the number of mines near
+    every cell and the regions of cells with no mines nearby are
+    computed once, when the board is created.
+    """
+
+    def __init__(self, height=8, width=8, mines=8, seed=None):
+
+        # Set initial width, height, and number of mines
+        self.height = height
+        self.width = width
+        self.mine_count = mines
+        if not 0 <= mines <= height * width:
+            raise ValueError("too many mines for the board")
+
+        # Draw the mine cells as the start of a random permutation
+        rng = np.random.default_rng(seed)
+        positions = rng.permutation(height * width)[:mines]
+        self.board = np.zeros((height, width), dtype=bool)
+        self.board.flat[positions] = True
+
+        # Count mines near each cell, summing the 3x3 window around it on
+        # a zero-padded copy of the board
+        padded = np.pad(self.board, 1).astype(np.uint8)
+        self.counts = np.zeros((height, width), dtype=np.uint8)
+        for di in range(3):
+            for dj in range(3):
+                if (di, dj) != (1, 1):
+                    self.counts += padded[di:di + height, dj:dj + width]
+
+        # Cells that are neither mines nor next to one, labelled by the
+        # region of such cells they belong to, and the cells of each region
+        # as a slice of `self.regions`, where the cells of region `label`
+        # start at `self.starts[label]`
+        self.zero = (self.counts == 0) & ~self.board
+        self.labels = label(self.zero)
+        zero = np.flatnonzero(self.zero)
+        order = np.argsort(self.labels.flat[zero], kind="stable")
+        self.regions = zero[order]
+        self.starts = np.searchsorted(
+            self.labels.flat[self.regions], np.arange(height * width + 1)
+        )
+
+        # At first, player has revealed no cells and found no mines
+        self.revealed = np.zeros((height, width), dtype=bool)
+        self.mines_found = set()
+
+    @property
+    def mines(self):
+        """
+        Set of all mine cells.
+        """
+        return set(zip(*map(np.ndarray.tolist, np.nonzero(self.board))))
+
+    def print(self):
+        """
+        Prints a text-based representation
+        of where mines are located.
+        """
+        for row in self.board:
+            print("--" * self.width + "-")
+            print("".join("|X" if mine else "| " for mine in row) + "|")
+        print("--" * self.width + "-")
+
+    def is_mine(self, cell):
+        i, j = cell
+        return bool(self.board[i, j])
+
+    def nearby_mines(self, cell):
+        """
+        Returns the number of mines that are
+        within one row and column of a given cell,
+        not including the cell itself.
+        """
+        i, j = cell
+        return int(self.counts[i, j])
+
+    def reveal(self, cell):
+        """
+        Reveals `cell`, and if no mine is near it, every cell reachable
+        from it through cells with no mines nearby, as in the game.
+
+        Returns the newly revealed cells, as an array of (i, j) rows.
+        """
+        i, j = cell
+        if self.revealed[i, j]:
+            return np.empty((0, 2), dtype=np.intp)
+        if self.board[i, j] or self.counts[i, j]:
+            self.revealed[i, j] = True
+            return np.array([[i, j]], dtype=np.intp)
+
+        # Reveal the cell's region and its border, which holds the
+        # numbered cells next to it
+        region = self.labels[i, j]
+        cells = self.regions[self.starts[region]:self.starts[region + 1]]
+        rows = (cells // self.width)[:, np.newaxis] + OFFSETS[:, 0]
+        columns = (cells % self.width)[:, np.newaxis] + OFFSETS[:, 1]
+        inside = ((rows >= 0) & (rows < self.height)
+                  & (columns >= 0) & (columns < self.width))
+        area = np.unique(rows[inside] * self.width + columns[inside])
+        area = area[~self.revealed.flat[area]]
+        self.revealed.flat[area] = True
+        return np.column_stack(np.divmod(area, self.width))
+
+    def won(self):
+        """
+        Checks if all mines have been flagged.
+        """
+        return self.mines_found == self.mines
+
+
+# Offsets of a cell and its eight neighbours
+OFFSETS = np.array(
+    [(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)], dtype=np.intp
+)
+
+
+def label(mask):
+    """
+    Returns an array labelling each cell of `mask` with the smallest
+    flat index in its region of cells connected in any of the eight
+    directions, and every other cell with -1.
+
+    Regions are found with a union-find over the pairs of neighbouring
+    cells, hooking each pair's larger root onto the smaller one and
+    compressing every path, until no pair joins two roots.
+    """
+    height, width = mask.shape
+
+    # With an empty column after each row, the neighbours of a cell to
+    # the right, below left, below and below right are a fixed number of
+    # cells after it in the flattened mask
+    padded = np.pad(mask, ((0, 0), (0, 1))).ravel()
+    cells = np.flatnonzero(padded)
+    number = np.zeros(len(padded), dtype=np.intp)
+    number[cells] = np.arange(len(cells))
+    firsts, seconds = [], []
+    for step in (1, width, width + 1, width + 2):
+        pairs = np.flatnonzero(padded[:-step] & padded[step:])
+        firsts.append(number[pairs])
+        seconds.append(number[pairs + step])
+    first, second = np.concatenate(firsts), np.concatenate(seconds)
+
+    parent = np.arange(len(cells))
+    while True:
+        a, b = parent[first], parent[second]
+        apart = a != b
+        if not apart.any():
+            break
+        first, second = first[apart], second[apart]
+        a, b = a[apart], b[apart]
+        parent[np.maximum(a, b)] = np.minimum(a, b)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    # Label each cell with the flat index of its root in the board
+    rows, columns = np.divmod(cells[parent], width + 1)
+    labels = np.full(mask.shape, -1, dtype=np.intp)
+    labels[mask] = rows * width + columns
+    return labels
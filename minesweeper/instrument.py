@@ -0,0 +1,142 @@
+import csv
+import json
+import math
+import time
+from collections import Counter
+
+
+class Histogram():
+    """
+    Distribution of recorded values, in buckets bounded by powers of two.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+        # Map the exponent e of each bucket, holding values below 2 ** e,
+        # to the number of values in it
+        self.buckets = Counter()
+
+    def record(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.buckets[math.frexp(value)[1]] += 1
+
+    def merge(self, other):
+        """
+        Adds the values recorded in `other` to this histogram.
+        """
+        self.count += other.count
+        self.total += other.total
+        for bound in (other.min, other.max):
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+        self.buckets.update(other.buckets)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "buckets": {
+                str(2.0 ** e): n for e, n in sorted(self.buckets.items())
+            },
+        }
+
+
+class Profiler():
+    """
+    Collects counters, and histograms of timings and sizes, from an
+    instrumented `MinesweeperAI`.
+
+    Timings are recorded in microseconds, under names of the form
+    "method" for whole calls and "method.phase" for their phases.
+    """
+
+    def __init__(self):
+        self.counters = Counter()
+        self.histograms = dict()
+
+    def clock(self):
+        """
+        Returns the current time, to pass to `lap`.
+        """
+        return time.perf_counter()
+
+    def lap(self, name, start):
+        """
+        Records the time elapsed since `start` under `name`, and returns
+        the current time.
+        """
+        now = time.perf_counter()
+        self.record(name, (now - start) * 1e6)
+        return now
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def record(self, name, value):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(value)
+
+    def merge(self, other):
+        """
+        Adds the counters and histograms of `other` to this profiler.
+        """
+        self.counters.update(other.counters)
+        for name, histogram in other.histograms.items():
+            self.histograms.setdefault(name, Histogram()).merge(histogram)
+
+    def to_dict(self):
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "histograms": {
+                name: self.histograms[name].to_dict()
+                for name in sorted(self.histograms)
+            },
+        }
+
+    def save_json(self, filename):
+        """
+        Writes the counters and histograms to `filename` as JSON.
+        """
+        with open(filename, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def save_csv(self, filename):
+        """
+        Writes the counters and histograms to `filename` as CSV, with one
+        row per counter, histogram statistic and histogram bucket.
+        """
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["name", "type", "key", "value"])
+            for name, value in sorted(self.counters.items()):
+                writer.writerow([name, "counter", "", value])
+            for name, histogram in sorted(self.histograms.items()):
+                summary = histogram.to_dict()
+                buckets = summary.pop("buckets")
+                for key, value in summary.items():
+                    writer.writerow([name, "histogram", key, value])
+                for bound, n in buckets.items():
+                    writer.writerow([name, "bucket", f"<{bound}", n])
+
+    def save(self, filename):
+        """
+        Writes the counters and histograms to `filename`, as CSV if its
+        name ends with ".csv", or as JSON otherwise.
+        """
+        if filename.endswith(".csv"):
+            self.save_csv(filename)
+        else:
+            self.save_json(filename)
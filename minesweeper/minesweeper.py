@@ -1,5 +1,8 @@
 import itertools
 import random
+from collections import deque
+
+from probability import ProbabilitySolver
 
 
 class Minesweeper():
@@ -132,16 +135,304 @@ class Sentence():
         self.cells.discard(cell)
 
 
+# Side of the square of cells a bitmask sentence can span
+SPAN = 3
+
+
+class MaskSentence():
+    """
+    Compact, immutable logical statement about a Minesweeper game.
+
+    The sentence's cells lie in the SPAN x SPAN square whose top left
+    cell is (`row`, `col`): cell (row + k // SPAN, col + k % SPAN) is in
+    the sentence if bit k of `mask` is set, and `count` of the cells are
+    mines. The square is anchored at the topmost row and leftmost column
+    holding a cell, so equal sentences have equal fields.
+    """
+
+    __slots__ = ("row", "col", "mask", "count")
+
+    def __init__(self, row, col, mask, count):
+        if mask:
+            drow, dcol, mask = NORMAL[mask]
+            row, col = row + drow, col + dcol
+        else:
+            row = col = 0
+        object.__setattr__(self, "row", row)
+        object.__setattr__(self, "col", col)
+        object.__setattr__(self, "mask", mask)
+        object.__setattr__(self, "count", count)
+
+    @classmethod
+    def from_cells(cls, cells, count):
+        """
+        Returns the sentence that `count` of `cells` are mines.
+        Raises ValueError if the cells do not fit in a SPAN x SPAN square.
+        """
+        if not cells:
+            return cls(0, 0, 0, count)
+        row = min(i for i, _ in cells)
+        col = min(j for _, j in cells)
+        mask = 0
+        for i, j in cells:
+            if not (i - row < SPAN and j - col < SPAN):
+                raise ValueError("cells do not fit in a sentence")
+            mask |= 1 << ((i - row) * SPAN + j - col)
+        return cls(row, col, mask, count)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("sentences are immutable")
+
+    def __eq__(self, other):
+        return (
+            self.mask == other.mask and self.count == other.count
+            and self.row == other.row and self.col == other.col
+        )
+
+    def __hash__(self):
+        return hash((self.row, self.col, self.mask, self.count))
+
+    def __str__(self):
+        return f"{set(self.cells())} = {self.count}"
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def cells(self):
+        """
+        Yields the cells of the sentence.
+        """
+        for k in bits(self.mask):
+            yield (self.row + k // SPAN, self.col + k % SPAN)
+
+    def bit(self, cell):
+        """
+        Returns the mask of `cell` in the sentence's square, 0 if the cell
+        is outside it.
+        """
+        i, j = cell[0] - self.row, cell[1] - self.col
+        if 0 <= i < SPAN and 0 <= j < SPAN:
+            return 1 << (i * SPAN + j)
+        return 0
+
+    def known_mines(self):
+        """
+        Returns the list of all cells known to be mines.
+        """
+        if self.mask.bit_count() == self.count:
+            return list(self.cells())
+        return []
+
+    def known_safes(self):
+        """
+        Returns the list of all cells known to be safe.
+        """
+        if not self.count:
+            return list(self.cells())
+        return []
+
+    def mark_mine(self, cell):
+        """
+        Returns the sentence left knowing that `cell` is a mine.
+        """
+        bit = self.bit(cell) & self.mask
+        if bit:
+            return MaskSentence(
+                self.row, self.col, self.mask & ~bit, self.count - 1
+            )
+        return self
+
+    def mark_safe(self, cell):
+        """
+        Returns the sentence left knowing that `cell` is safe.
+        """
+        bit = self.bit(cell) & self.mask
+        if bit:
+            return MaskSentence(
+                self.row, self.col, self.mask & ~bit, self.count
+            )
+        return self
+
+    def shifted(self, other):
+        """
+        Returns the mask of this sentence's cells in the square of
+        `other`, or None if some of them are outside it.
+        """
+        drow, dcol = self.row - other.row, self.col - other.col
+        if not (0 <= drow < SPAN and 0 <= dcol < SPAN):
+            return None
+        if self.mask & ~COLUMNS[SPAN - dcol]:
+            return None
+        mask = self.mask << (drow * SPAN + dcol)
+        if mask >> (SPAN * SPAN):
+            return None
+        return mask
+
+    def issubset(self, other):
+        """
+        Returns whether every cell of this sentence is in `other`.
+        """
+        if not self.mask:
+            return True
+        mask = self.shifted(other)
+        return mask is not None and mask & ~other.mask == 0
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells of this sentence that are
+        not in `other`, a subset of it.
+        """
+        mask = other.shifted(self) if other.mask else 0
+        return MaskSentence(
+            self.row, self.col, self.mask & ~mask, self.count - other.count
+        )
+
+
+def bits(mask):
+    """
+    Yields the indices of the bits set in `mask`, lowest first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def normalize(mask):
+    """
+    Returns the number of empty rows and columns at the top and left of
+    the square of `mask`, and the mask moved up and left past them.
+    """
+    ks = list(bits(mask))
+    drow = min(k // SPAN for k in ks)
+    dcol = min(k % SPAN for k in ks)
+    return drow, dcol, mask >> (drow * SPAN + dcol)
+
+
+# Normalized form of every nonempty mask, and the masks of the cells in
+# the first k columns of a square
+NORMAL = [None] + [normalize(mask) for mask in range(1, 1 << SPAN * SPAN)]
+COLUMNS = [
+    sum(1 << (i * SPAN + j) for i in range(SPAN) for j in range(k))
+    for k in range(SPAN + 1)
+]
+
+
+class Knowledge():
+    """
+    Set of sentences about a Minesweeper game, indexed by cell.
+
+    Every cell maps to the sentences containing it, so marking a cell
+    only updates the sentences it appears in. Updated sentences are
+    queued as dirty until the conclusions they allow have been drawn.
+    """
+
+    def __init__(self):
+
+        # Sentences known to be true
+        self.sentences = set()
+
+        # Map each cell to the sentences containing it
+        self.containing = dict()
+
+        # Sentences added or changed since their last inspection
+        self.dirty = deque()
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def __iter__(self):
+        return iter(list(self.sentences))
+
+    def __contains__(self, sentence):
+        return sentence in self.sentences
+
+    def add(self, sentence):
+        """
+        Adds `sentence` to the knowledge, unless it is already known.
+        Returns whether the sentence was added.
+        """
+        if sentence in self.sentences:
+            return False
+        self.sentences.add(sentence)
+        for cell in sentence.cells():
+            self.containing.setdefault(cell, set()).add(sentence)
+        self.dirty.append(sentence)
+        return True
+
+    def remove(self, sentence):
+        """
+        Removes `sentence` from the knowledge.
+        """
+        self.sentences.discard(sentence)
+        for cell in sentence.cells():
+            sentences = self.containing.get(cell)
+            if sentences is not None:
+                sentences.discard(sentence)
+                if not sentences:
+                    del self.containing[cell]
+
+    def related(self, sentence):
+        """
+        Returns the other sentences sharing a cell with `sentence`.
+        """
+        related = set()
+        for cell in sentence.cells():
+            related |= self.containing.get(cell, set())
+        related.discard(sentence)
+        return related
+
+    def update(self, cell, mark):
+        """
+        Replaces each sentence containing `cell` with the sentence
+        returned by `mark`, called with the sentence and `cell`.
+        """
+        for sentence in self.containing.pop(cell, ()):
+            self.remove(sentence)
+            self.add(mark(sentence, cell))
+
+    def mark_mine(self, cell):
+        """
+        Updates every sentence containing `cell`, a known mine.
+        """
+        self.update(cell, MaskSentence.mark_mine)
+
+    def mark_safe(self, cell):
+        """
+        Updates every sentence containing `cell`, a known safe cell.
+        """
+        self.update(cell, MaskSentence.mark_safe)
+
+    def pop_dirty(self):
+        """
+        Returns a dirty sentence still in the knowledge, or None if no
+        sentence is dirty. Empty sentences are dropped on the way.
+        """
+        while self.dirty:
+            sentence = self.dirty.popleft()
+            if sentence not in self.sentences:
+                continue
+            if not sentence.mask:
+                self.remove(sentence)
+                continue
+            return sentence
+        return None
+
+
 class MinesweeperAI():
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None, profiler=None):
 
-        # Set initial height and width
+        # Set initial height and width, and number of mines if known
         self.height = height
         self.width = width
+        self.mine_count = mines
+
+        # Optional instrument.Profiler recording timings and sizes
+        self.profiler = profiler
 
         # Keep track of which cells have been clicked on
         self.moves_made = set()
@@ -150,8 +441,12 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Keep track of safe cells that have not been clicked on yet
+        self.safe_moves = set()
+
+        # Sentences about the game known to be true
+        self.knowledge = Knowledge()
+        self.solver = ProbabilitySolver()
 
         # Set of all possible cells
         self.cells = set()
@@ -165,8 +460,7 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.knowledge.mark_mine(cell)
 
     def mark_safe(self, cell):
         """
@@ -174,8 +468,9 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        if cell not in self.moves_made:
+            self.safe_moves.add(cell)
+        self.knowledge.mark_safe(cell)
 
     def add_knowledge(self, cell, count):
         """
@@ -192,50 +487,73 @@ class MinesweeperAI():
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
         """
+        profiler = self.profiler
+        if profiler:
+            start = lap = profiler.clock()
+
         # 1) mark the cell as a move that has been made
         self.moves_made.add(cell)
+        self.safe_moves.discard(cell)
 
         # 2) mark the cell as safe
         self.mark_safe(cell)
+        if profiler:
+            lap = profiler.lap("add_knowledge.mark", lap)
 
         # 3) add a new sentence to the AI's knowledge base based on the value of `cell` and `count`
-        nearby = self.nearby_cells(cell) - (self.safes | self.moves_made)
-        new_sentence = Sentence(nearby, count)
-        self.knowledge.append(new_sentence)
-
-        # 4) mark any additional cells as safe or as mines if it can be concluded based on the AI's knowledge base
-        safes, mines = set(), set()
-
-        for sentence in self.knowledge:
-            if not sentence.cells:
-                self.knowledge.remove(sentence)
-            else:
-                s, m = sentence.known_safes(), sentence.known_mines()
-                if s:
-                    for elem in s:
-                        safes.add(elem)
-                if m:
-                    for elem in m:
-                        mines.add(elem)
-
-        for s in safes:
-            self.mark_safe(s)
-        for m in mines:
-            self.mark_mine(m)
-
-        # 5) add any new sentences to the AI's knowledge base if they can be inferred from existing knowledge
-        new_knowledge = []
-
-        for sentence in self.knowledge:
-            if new_sentence == sentence:
-                break
-            elif new_sentence.cells <= sentence.cells:
-                cells = sentence.cells - new_sentence.cells
-                count = sentence.count - new_sentence.count
-                new_knowledge.append(Sentence(cells, count))
-            new_sentence = sentence
-
-        self.knowledge.extend(new_knowledge)
+        cells = []
+        for nearby in self.nearby_cells(cell):
+            if nearby in self.mines:
+                count -= 1
+            elif nearby not in self.safes and nearby not in self.moves_made:
+                cells.append(nearby)
+        new_sentence = MaskSentence.from_cells(cells, count)
+        self.knowledge.add(new_sentence)
+        if profiler:
+            lap = profiler.lap("add_knowledge.sentence", lap)
+
+        # 4) mark any additional cells as safe or as mines, and
+        # 5) add any new sentences that can be inferred, until nothing changes
+        derived = self.infer()
+        if profiler:
+            profiler.lap("add_knowledge.infer", lap)
+            profiler.lap("add_knowledge", start)
+            profiler.count("add_knowledge")
+            profiler.count("derived", derived)
+            profiler.record("derived", derived)
+            profiler.record("knowledge", len(self.knowledge))
+
+    def infer(self):
+        """
+        Draws every conclusion from the dirty sentences, until no sentence
+        is dirty: cells a sentence shows to be safe or mines are marked,
+        and for each pair of related sentences where one is a subset of
+        the other, the sentence about their difference is added.
+
+        Marked and added sentences become dirty in turn, so the knowledge
+        reaches a fixpoint, and only sentences affected by a change are
+        ever looked at. Returns the number of sentences derived.
+        """
+        derived = 0
+        while True:
+            sentence = self.knowledge.pop_dirty()
+            if sentence is None:
+                return derived
+
+            safes, mines = sentence.known_safes(), sentence.known_mines()
+            if safes or mines:
+                for cell in safes:
+                    self.mark_safe(cell)
+                for cell in mines:
+                    self.mark_mine(cell)
+                continue
+
+            # Candidate pairs share a cell, found through the cell index
+            for other in self.knowledge.related(sentence):
+                if sentence.issubset(other):
+                    derived += self.knowledge.add(other.difference(sentence))
+                elif other.issubset(sentence):
+                    derived += self.knowledge.add(sentence.difference(other))
 
     def make_safe_move(self):
         """
@@ -246,9 +564,16 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        moves = self.safes - self.moves_made
-        if moves:
-            return moves.pop()
+        profiler = self.profiler
+        if profiler:
+            start = profiler.clock()
+            profiler.count("make_safe_move")
+        move = next(iter(self.safe_moves), None)
+        if profiler:
+            profiler.lap("make_safe_move", start)
+            if move is None:
+                profiler.count("make_safe_move.none")
+        return move
 
     def make_random_move(self):
         """
@@ -256,10 +581,45 @@ class MinesweeperAI():
         Should choose randomly among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+
+        Among those, the cells least likely to be mines are chosen from,
+        given the knowledge base and the number of mines, if known.
         """
+        profiler = self.profiler
+        if profiler:
+            start = lap = profiler.clock()
+            profiler.count("make_random_move")
+
         random_moves = self.cells - self.moves_made - self.mines
-        if random_moves:
-            return random_moves.pop()
+        if not random_moves:
+            return None
+
+        remaining = None
+        if self.mine_count is not None:
+            remaining = self.mine_count - len(self.mines)
+        frontier, rest = self.solver.probabilities(
+            self.knowledge, len(random_moves), remaining
+        )
+        if profiler:
+            lap = profiler.lap("make_random_move.probabilities", lap)
+            profiler.record("frontier", len(frontier))
+
+        # Cells off the frontier all share the same risk
+        best = min(frontier.values(), default=rest)
+        if len(frontier) < len(random_moves) and rest <= best:
+            best = rest
+            move = random.choice([
+                cell for cell in random_moves if cell not in frontier
+            ])
+        else:
+            move = random.choice([
+                cell for cell, risk in frontier.items() if risk == best
+            ])
+        if profiler:
+            profiler.lap("make_random_move.choose", lap)
+            profiler.lap("make_random_move", start)
+            profiler.record("risk", best)
+        return move
 
     def nearby_cells(self, cell):
         """
@@ -0,0 +1,362 @@
+import atexit
+import math
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Mine density assumed when the number of mines is unknown, that of the
+# default 8x8 game with 8 mines
+DEFAULT_DENSITY = 8 / 64
+
+# Worker pool shared by every solver, started on first use
+executor = None
+
+
+def shared_executor():
+    """
+    Returns the shared worker pool, starting it if needed. The pool is
+    shut down when the interpreter exits.
+    """
+    global executor
+    if executor is None:
+        executor = ProcessPoolExecutor()
+        atexit.register(executor.shutdown)
+    return executor
+
+
+class ProbabilitySolver():
+    """
+    Computes the probability that each unknown cell is a mine, given
+    sentences about a Minesweeper game.
+
+    The frontier, the cells in some sentence, is split into components
+    of cells linked by sentences. The mine configurations of each
+    component are counted independently, and the counts are combined
+    with the number of mines left on the board. Components are cached
+    between calls, so only the components that changed are solved again,
+    and components with more than `threshold` cells are solved in the
+    worker pool shared by every solver.
+    """
+
+    def __init__(self, threshold=24):
+        self.threshold = threshold
+
+        # Map each component's constraints to its solution
+        self.cache = dict()
+
+    def solve_components(self, components):
+        """
+        Returns the solutions of `components`, lists of constraints.
+        """
+        solutions = dict()
+        pending = []
+        for constraints in components:
+            key = frozenset(constraints)
+            if key in self.cache:
+                solutions[key] = self.cache[key]
+            elif len(variables(constraints)) > self.threshold:
+                future = shared_executor().submit(solve_component, constraints)
+                pending.append((key, future))
+            else:
+                solutions[key] = solve_component(constraints)
+        for key, future in pending:
+            solutions[key] = future.result()
+
+        # Only keep the components still in the knowledge
+        self.cache = solutions
+        return [
+            solutions[frozenset(constraints)] for constraints in components
+        ]
+
+    def probabilities(self, sentences, unknown, mines=None):
+        """
+        Returns the mine probability of each frontier cell, as a dict of
+        cell -> probability, and the mine probability of any other
+        unknown cell.
+
+        `sentences` are the sentences known to be true, `unknown` is the
+        number of cells not known to be safe or mines, and `mines` is the
+        number of mines among them, or None if it is not known.
+        """
+        constraints = [
+            (tuple(sorted(sentence.cells())), sentence.count)
+            for sentence in sentences if len(sentence)
+        ]
+        components = split(constraints)
+        solutions = self.solve_components(components)
+        frontier = sum(len(cells) for cells, _, _ in solutions)
+        rest = unknown - frontier
+
+        if mines is None:
+            return independent(solutions, DEFAULT_DENSITY), DEFAULT_DENSITY
+        return combined(solutions, rest, mines)
+
+
+def variables(constraints):
+    """
+    Returns the cells in `constraints`, a list of (cells, count) pairs.
+    """
+    cells = set()
+    for members, _ in constraints:
+        cells.update(members)
+    return sorted(cells)
+
+
+def split(constraints):
+    """
+    Returns the constraints grouped into components, where constraints
+    sharing a cell are in the same component.
+    """
+    parent = dict()
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, _ in constraints:
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        root = find(cells[0])
+        for cell in cells[1:]:
+            other = find(cell)
+            if other != root:
+                parent[other] = root
+
+    components = dict()
+    for constraint in constraints:
+        root = find(constraint[0][0])
+        components.setdefault(root, []).append(constraint)
+    return list(components.values())
+
+
+def solve_component(constraints):
+    """
+    Counts the mine configurations of one component satisfying all of
+    `constraints`, a list of (cells, count) pairs.
+
+    Returns a tuple (cells, total, mined), where `cells` lists the cells
+    of the component, `total[k]` is the number of configurations
+    with k mines, and `mined[v][k]` the number of those where cells[v]
+    is a mine.
+
+    Cells are assigned in breadth-first order, and configurations are
+    counted by dynamic programming over the mine counts of the
+    constraints that are partially assigned: prefixes that agree on
+    those counts have the same completions, so they are counted once.
+    """
+    cells = order(constraints)
+    position = {cell: v for v, cell in enumerate(cells)}
+    members = [
+        [position[cell] for cell in group] for group, _ in constraints
+    ]
+    counts = [count for _, count in constraints]
+    n = len(cells)
+
+    # Constraints containing each cell, and the constraints with cells
+    # both at or before and after each position
+    touching = [[] for _ in range(n)]
+    for c, positions in enumerate(members):
+        for v in positions:
+            touching[v].append(c)
+    spans = [(min(positions), max(positions)) for positions in members]
+    open_after = [
+        [c for c, (first, last) in enumerate(spans) if first <= v < last]
+        for v in range(n)
+    ]
+    left = [
+        {c: sum(1 for w in members[c] if w > v) for c in touching[v]}
+        for v in range(n)
+    ]
+
+    # Forward pass: map the state after each position to the number of
+    # prefixes reaching it, by number of mines
+    layers = [{(): {0: 1}}]
+    transitions = []
+    previous_open = []
+    for v in range(n):
+        layer = dict()
+        steps = []
+        for state, ways in layers[-1].items():
+            mines = dict(zip(previous_open, state))
+            for value in (0, 1):
+                current = dict(mines)
+                feasible = True
+                for c in touching[v]:
+                    current[c] = current.get(c, 0) + value
+                    if not (current[c] <= counts[c]
+                            <= current[c] + left[v][c]):
+                        feasible = False
+                        break
+                if not feasible:
+                    continue
+                following = tuple(current.get(c, 0) for c in open_after[v])
+                add(layer.setdefault(following, dict()), ways, value)
+                steps.append((state, value, following))
+        layers.append(layer)
+        transitions.append(steps)
+        previous_open = open_after[v]
+
+    total = layers[-1].get((), dict())
+
+    # Backward pass: map the state after each position to the number of
+    # suffixes completing it, and count the configurations mining each
+    # cell from the prefixes and suffixes around it
+    after = {(): {0: 1}}
+    mined = [None] * n
+    for v in range(n - 1, -1, -1):
+        before = dict()
+        mined[v] = dict()
+        for state, value, following in transitions[v]:
+            if following not in after:
+                continue
+            suffixes = after[following]
+            add(before.setdefault(state, dict()), suffixes, value)
+            if value:
+                add(mined[v], multiply(layers[v][state], suffixes), 1)
+        after = before
+
+    return cells, total, mined
+
+
+def order(constraints):
+    """
+    Returns the cells of `constraints` in breadth-first order, visiting
+    the cells of each constraint together, which keeps few constraints
+    partially assigned at any point.
+    """
+    containing = dict()
+    for members, _ in constraints:
+        for cell in members:
+            containing.setdefault(cell, []).append(members)
+
+    cells = []
+    seen = set()
+    for start in sorted(containing):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            cells.append(cell)
+            for members in containing[cell]:
+                for other in members:
+                    if other not in seen:
+                        seen.add(other)
+                        queue.append(other)
+    return cells
+
+
+def add(target, polynomial, shift):
+    """
+    Adds `polynomial`, a dict of mines -> ways, to `target`, with every
+    number of mines increased by `shift`.
+    """
+    for k, ways in polynomial.items():
+        target[k + shift] = target.get(k + shift, 0) + ways
+
+
+def multiply(a, b):
+    """
+    Returns the product of two polynomials, dicts of mines -> ways.
+    """
+    product = dict()
+    for i, x in a.items():
+        for j, y in b.items():
+            product[i + j] = product.get(i + j, 0) + x * y
+    return product
+
+
+def independent(solutions, density):
+    """
+    Returns the mine probability of each frontier cell, assuming every
+    cell is a mine with probability `density` independently.
+    """
+    odds = density / (1 - density)
+    probabilities = dict()
+    for cells, total, mined in solutions:
+        weight = sum(ways * odds ** k for k, ways in total.items())
+        for cell, polynomial in zip(cells, mined):
+            probabilities[cell] = sum(
+                ways * odds ** k for k, ways in polynomial.items()
+            ) / weight
+    return probabilities
+
+
+def combined(solutions, rest, mines):
+    """
+    Returns the mine probability of each frontier cell, and that of the
+    `rest` other unknown cells, given that there are `mines` mines.
+
+    A configuration of the frontier with K mines extends to
+    C(rest, mines - K) configurations of the whole board. On large
+    boards these numbers have many thousands of digits, so weights are
+    kept as logarithms, and only their ratios to the largest weight are
+    summed, as floats.
+    """
+    # Configurations of all components but one, from prefix and suffix
+    # products of the components' polynomials
+    totals = [total for _, total, _ in solutions]
+    prefixes = [{0: 1}]
+    for total in totals:
+        prefixes.append(multiply(prefixes[-1], total))
+    suffixes = [{0: 1}]
+    for total in reversed(totals):
+        suffixes.append(multiply(suffixes[-1], total))
+    suffixes.reverse()
+
+    # Logarithm of the number of extensions of a frontier configuration
+    # with k mines, or -inf if there are none
+    everything = prefixes[-1]
+    base = math.lgamma(rest + 1)
+    extensions = [
+        base - math.lgamma(mines - k + 1) - math.lgamma(rest - mines + k + 1)
+        if 0 <= mines - k <= rest else -math.inf
+        for k in range(max(everything) + 1)
+    ]
+
+    # Weigh each term against the largest, the reference
+    terms = {
+        k: math.log(ways) + extensions[k] for k, ways in everything.items()
+    }
+    reference = max(terms.values())
+    if reference == -math.inf:
+        return {}, mines / rest if rest else 0
+    weight = sum(math.exp(term - reference) for term in terms.values())
+
+    probabilities = dict()
+    for i, (cells, total, mined) in enumerate(solutions):
+        others = multiply(prefixes[i], suffixes[i + 1])
+        completions = {
+            k: log_sum(
+                math.log(ways) + extensions[k + j]
+                for j, ways in others.items()
+            )
+            for k in total
+        }
+        for cell, polynomial in zip(cells, mined):
+            probabilities[cell] = sum(
+                math.exp(math.log(ways) + completions[k] - reference)
+                for k, ways in polynomial.items()
+            ) / weight
+
+    # Each other cell holds its share of the mines off the frontier
+    if not rest:
+        return probabilities, 0
+    expected = sum(
+        math.exp(term - reference) * (mines - k) for k, term in terms.items()
+    )
+    return probabilities, expected / weight / rest
+
+
+def log_sum(logarithms):
+    """
+    Returns the logarithm of the sum of the numbers whose logarithms are
+    `logarithms`, -inf if there are none or all are -inf.
+    """
+    logarithms = list(logarithms)
+    top = max(logarithms, default=-math.inf)
+    if top == -math.inf:
+        return top
+    return top + math.log(sum(math.exp(x - top) for x in logarithms))
@@ -0,0 +1,179 @@
+import argparse
+import math
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from instrument import Profiler
+from minesweeper import Minesweeper, MinesweeperAI
+
+
+def play(height, width, mines, seed, profiler=None):
+    """
+    Play one game with a board drawn from `seed`, and return whether it
+    was won, the number of moves and of guesses made, the time spent in
+    `add_knowledge`, and a Counter of knowledge sizes after each move.
+    The AI reports to `profiler`, if given.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines,
+                       profiler=profiler)
+
+    # Games already run in parallel, so every component is solved here
+    ai.solver.threshold = math.inf
+
+    moves = guesses = 0
+    inference = 0.0
+    sizes = Counter()
+    safe_cells = height * width - mines
+    while len(ai.moves_made) < safe_cells:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            guesses += 1
+        if move is None or game.is_mine(move):
+            return False, moves, guesses, inference, sizes
+        moves += 1
+        start = time.perf_counter()
+        ai.add_knowledge(move, game.nearby_mines(move))
+        inference += time.perf_counter() - start
+        sizes[len(ai.knowledge)] += 1
+    return True, moves, guesses, inference, sizes
+
+
+def new_totals(profile=False):
+    """
+    Returns empty totals of game results, with a profiler if `profile`
+    is true.
+    """
+    return {"games": 0, "wins": 0, "moves": 0, "guesses": 0,
+            "inference": 0.0, "sizes": Counter(),
+            "profiler": Profiler() if profile else None}
+
+
+def play_many(height, width, mines, seeds, profile=False):
+    """
+    Play one game for each of `seeds`, and return the totals of their
+    results.
+    """
+    totals = new_totals(profile)
+    for seed in seeds:
+        won, moves, guesses, inference, sizes = play(
+            height, width, mines, seed, totals["profiler"]
+        )
+        totals["games"] += 1
+        totals["wins"] += won
+        totals["moves"] += moves
+        totals["guesses"] += guesses
+        totals["inference"] += inference
+        totals["sizes"].update(sizes)
+    return totals
+
+
+def simulate(games, height=8, width=8, mines=8, seed=0, processes=None,
+             chunk=100, profile=False):
+    """
+    Play `games` games with seeds `seed`, `seed` + 1, ..., in chunks of
+    `chunk` games spread over a pool of `processes` processes, and return
+    the totals of their results and the elapsed time. If `profile` is
+    true, the totals include a profiler merged from every game.
+    """
+    totals = new_totals(profile)
+    chunks = [
+        range(start, min(start + chunk, seed + games))
+        for start in range(seed, seed + games, chunk)
+    ]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(processes) as executor:
+        for result in executor.map(
+            play_many, repeat(height), repeat(width), repeat(mines), chunks,
+            repeat(profile)
+        ):
+            for key, value in result.items():
+                if key == "profiler":
+                    if value is not None:
+                        totals[key].merge(value)
+                else:
+                    totals[key] += value
+    return totals, time.perf_counter() - start
+
+
+def percentile(counter, fraction):
+    """
+    Returns the smallest value of `counter`, a Counter of values, that
+    is at least `fraction` of its values.
+    """
+    target = fraction * sum(counter.values())
+    seen = 0
+    for value in sorted(counter):
+        seen += counter[value]
+        if seen >= target:
+            return value
+    return 0
+
+
+def main():
+
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(usage=(
+        "python simulate.py [--games N] [--height H] [--width W] "
+        "[--mines M | --density D] [--seed SEED] [--processes P] "
+        "[--chunk C] [--profile FILE]"
+    ))
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=8)
+    parser.add_argument("--width", type=int, default=8)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--mines", type=int)
+    group.add_argument("--density", type=float,
+                       help="fraction of cells that are mines")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first board")
+    parser.add_argument("--processes", type=int,
+                        help="number of worker processes")
+    parser.add_argument("--chunk", type=int, default=100,
+                        help="number of games per task")
+    parser.add_argument("--profile",
+                        help="file to write AI profile to, as JSON or CSV")
+    args = parser.parse_args()
+
+    cells = args.height * args.width
+    if args.mines is not None:
+        mines = args.mines
+    elif args.density is not None:
+        mines = round(args.density * cells)
+    else:
+        mines = round(cells / 8)
+    if not 0 < mines < cells:
+        parser.error("there must be at least one mine and one safe cell")
+
+    totals, elapsed = simulate(
+        args.games, args.height, args.width, mines,
+        args.seed, args.processes, args.chunk, args.profile is not None
+    )
+
+    # Print report
+    games, moves, sizes = totals["games"], totals["moves"], totals["sizes"]
+    print(f"Board: {args.height}x{args.width}, {mines} mines")
+    print(f"Games: {games} in {elapsed:.2f}s")
+    print(f"Win rate: {totals['wins'] / games:.2%}")
+    print(f"Moves: {moves} ({moves / elapsed:.0f} per second)")
+    print(f"Guesses per game: {totals['guesses'] / games:.2f}")
+    if moves:
+        print(f"Inference time per move: "
+              f"{totals['inference'] / moves * 1000:.3f}ms")
+        print(f"Knowledge size: "
+              f"mean {sum(k * n for k, n in sizes.items()) / moves:.1f}, "
+              f"median {percentile(sizes, 0.5)}, "
+              f"p90 {percentile(sizes, 0.9)}, "
+              f"p99 {percentile(sizes, 0.99)}, "
+              f"max {max(sizes)}")
+    if args.profile:
+        totals["profiler"].save(args.profile)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from board import Board
+from minesweeper import Minesweeper
+
+
+class BoardTest(unittest.TestCase):
+    """
+    Compare the array-backed board with `Minesweeper` on random boards.
+    """
+
+    def flood(self, game, cell):
+        """
+        Returns the cells revealed by clicking `cell` in `game`, found by
+        a search from it through cells with no mines nearby.
+        """
+        revealed = {cell}
+        stack = [cell]
+        while stack:
+            i, j = stack.pop()
+            if game.is_mine((i, j)) or game.nearby_mines((i, j)):
+                continue
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    nearby = (i + di, j + dj)
+                    if (0 <= nearby[0] < game.height
+                            and 0 <= nearby[1] < game.width
+                            and nearby not in revealed):
+                        revealed.add(nearby)
+                        stack.append(nearby)
+        return revealed
+
+    def test_board_agrees_with_minesweeper(self):
+        rng = random.Random(0)
+        for seed in range(40):
+            height, width = rng.randint(1, 30), rng.randint(1, 30)
+            mines = rng.randint(0, height * width // 4)
+            board = Board(height, width, mines, seed=seed)
+
+            # Play the same mines in the reference game
+            game = Minesweeper(height, width, 0)
+            game.board = board.board.tolist()
+            game.mines = board.mines
+
+            with self.subTest(seed=seed, height=height, width=width):
+                self.assertEqual(len(board.mines), mines)
+                for i in range(height):
+                    for j in range(width):
+                        cell = (i, j)
+                        self.assertEqual(board.is_mine(cell),
+                                         game.is_mine(cell))
+                        self.assertEqual(board.nearby_mines(cell),
+                                         game.nearby_mines(cell))
+
+                # Reveal cells in random order, each revealing what the
+                # reference search finds less what is already revealed
+                shown = set()
+                cells = [(i, j) for i in range(height) for j in range(width)]
+                rng.shuffle(cells)
+                for cell in cells[:10]:
+                    revealed = {
+                        tuple(row) for row in board.reveal(cell).tolist()
+                    }
+                    expected = set() if cell in shown else (
+                        self.flood(game, cell) - shown
+                    )
+                    self.assertEqual(revealed, expected)
+                    shown |= revealed
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -178,12 +178,14 @@ class NimAI():
         return best_action
 
 
-def train(n):
+def train(n, player=None):
     """
     Train an AI by playing `n` games against itself.
+    `player` is the AI to train, by default a new `NimAI`.
     """
 
-    player = NimAI()
+    if player is None:
+        player = NimAI()
 
     # Play n games
     for i in range(n):
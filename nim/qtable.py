@@ -0,0 +1,160 @@
+import random
+
+import numpy as np
+
+from nim import NimAI
+
+
+class QTable():
+    """
+    Dense table of Q-values for every state and action of a Nim game
+    starting from piles `initial`.
+
+    A state, a list of piles, is numbered in mixed radix: pile i is a
+    digit in base initial[i] + 1. Action (i, j) is slot offsets[i] + j - 1,
+    so each pile's actions are contiguous. Slots of actions not available
+    in a state hold -inf, so the best action is the row's argmax.
+    """
+
+    def __init__(self, initial=[1, 3, 5, 7]):
+        self.initial = list(initial)
+
+        # Weight of each pile in the state number
+        self.strides = []
+        states = 1
+        for pile in reversed(self.initial):
+            self.strides.append(states)
+            states *= pile + 1
+        self.strides.reverse()
+
+        # First slot of each pile's actions, and the action of each slot
+        self.offsets = []
+        self.actions = []
+        for i, pile in enumerate(self.initial):
+            self.offsets.append(len(self.actions))
+            self.actions.extend((i, j) for j in range(1, pile + 1))
+
+        # Mark the available actions of every state: (i, j) is available
+        # if pile i holds at least j objects
+        piles = np.indices([pile + 1 for pile in self.initial])
+        piles = piles.reshape(len(self.initial), states)
+        self.valid = np.zeros((states, len(self.actions)), dtype=bool)
+        for slot, (i, j) in enumerate(self.actions):
+            self.valid[:, slot] = piles[i] >= j
+
+        # Slots of the available actions of every state
+        self.available = [np.flatnonzero(row) for row in self.valid]
+
+        self.values = np.where(self.valid, 0.0, -np.inf)
+
+        # Slots whose value has been learned, even if it is still 0
+        self.learned = np.zeros((states, len(self.actions)), dtype=bool)
+
+    def state(self, piles):
+        """
+        Returns the number of the state with piles `piles`.
+        """
+        index = 0
+        for pile, stride in zip(piles, self.strides):
+            index += pile * stride
+        return index
+
+    def slot(self, action):
+        """
+        Returns the slot of action `action`.
+        """
+        i, j = action
+        return self.offsets[i] + j - 1
+
+    def items(self):
+        """
+        Yields ((state, action), value) for every Q-value that has been
+        learned, with states as tuples of piles.
+        """
+        for index, slot in zip(*np.nonzero(self.learned)):
+            piles = tuple(
+                int(index) // stride % (pile + 1)
+                for pile, stride in zip(self.initial, self.strides)
+            )
+            yield (piles, self.actions[slot]), float(self.values[index, slot])
+
+
+class DenseNimAI(NimAI):
+    """
+    Nim player learning the same Q-values as `NimAI`, stored in a
+    `QTable` instead of a dictionary.
+    """
+
+    def __init__(self, alpha=0.5, epsilon=0.1, initial=[1, 3, 5, 7]):
+        self.table = QTable(initial)
+        self.alpha = alpha
+        self.epsilon = epsilon
+
+    @property
+    def q(self):
+        """
+        Dictionary of learned Q-values, as kept by `NimAI`.
+        """
+        return dict(self.table.items())
+
+    def update(self, old_state, action, new_state, reward):
+        """
+        Update Q-learning model, given an old state, an action taken
+        in that state, a new resulting state, and the reward received
+        from taking that action.
+        """
+        table = self.table
+        index, slot = table.state(old_state), table.slot(action)
+        old = table.values[index, slot]
+        best_future = self.best_future_reward(new_state)
+        table.values[index, slot] = (
+            old + self.alpha * (reward + best_future - old)
+        )
+        table.learned[index, slot] = True
+
+    def get_q_value(self, state, action):
+        """
+        Return the Q-value for the state `state` and the action `action`.
+        """
+        return float(
+            self.table.values[self.table.state(state), self.table.slot(action)]
+        )
+
+    def update_q_value(self, state, action, old_q, reward, future_rewards):
+        """
+        Update the Q-value for the state `state` and the action `action`.
+        """
+        index, slot = self.table.state(state), self.table.slot(action)
+        self.table.values[index, slot] = (
+            old_q + self.alpha * (reward + future_rewards - old_q)
+        )
+        self.table.learned[index, slot] = True
+
+    def best_future_reward(self, state):
+        """
+        Return the maximum Q-value of the actions available in `state`,
+        or 0 if it is higher, or if no action is available.
+        """
+        return max(float(self.table.values[self.table.state(state)].max()), 0)
+
+    def choose_action(self, state, epsilon=True):
+        """
+        Given a state `state`, return an action `(i, j)` to take: the best
+        available action, or with probability `self.epsilon` if `epsilon`
+        is `True`, any other available action.
+        """
+        table = self.table
+        index = table.state(state)
+        available = table.available[index]
+        if not len(available):
+            return None
+        best = int(table.values[index].argmax())
+
+        # Draw among the other actions by skipping over the best one
+        if epsilon and len(available) > 1 and random.random() < self.epsilon:
+            k = random.randrange(len(available) - 1)
+            if k >= np.searchsorted(available, best):
+                k += 1
+            return table.actions[available[k]]
+
+        return table.actions[best]